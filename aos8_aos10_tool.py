@@ -30,9 +30,11 @@ if user_input.strip().lower() != 'yes':
 # - Real-time dashboard monitoring
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from getpass import getpass
 from tabulate import tabulate
-from collections import defaultdict
+from collections import defaultdict, deque, Counter
 import urllib3
 import sqlite3
 from datetime import datetime
@@ -41,53 +43,168 @@ import json
 import paramiko
 import time
 import re
+import socket
 import threading
 import sys
+import itertools
+import logging
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import orjson  # Optional, faster decoding of large show command responses
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # Optional, streams very large AP database responses
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
 
 # Disable InsecureRequestWarning (useful for self-signed certificates)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Global variables
 stored_md_switches = []
+_nodepath_cache = None  # (stored_md_switches, unique nodepaths), see get_md_nodepaths()
 mc_username = None
 mc_password = None
 selected_cluster = None  # Track the currently selected cluster
 selected_ap_groups = []  # Track the AP groups that have been added to convert
 prep_migration_target = None  # Track the nodepath and cluster used in prep migration
-monitoring_active = False  # Flag to control dashboard monitoring
+_stop_event = threading.Event()  # Set to stop dashboard monitoring
 dashboard_thread = None  # Thread for dashboard monitoring
+_session_cache = {}  # Authenticated (session, token, uid) per controller IP
+_db_conn = None  # Shared connection to the migration database, see get_conn()
+_db_conn_lock = threading.Lock()
+_cluster_controllers_cache = {}  # Controllers per cluster name, reused while monitoring
+_all_controllers_cache = None  # Result of get_all_controllers() until the next store or clear
+_clusters_with_nodepaths_cache = None  # Result of get_all_clusters_with_nodepaths() until the next store or clear
+_ssh_pool = {}  # (ip, username) -> (ssh_client, shell or None), reused across menu actions
+_ssh_pool_lock = threading.Lock()
+
+# Connection pool shared by all controller sessions; retries transient gateway errors
+_shared_adapter = HTTPAdapter(
+    pool_connections=64,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+
+AP_DATABASE_STREAM_THRESHOLD = 1024 * 1024  # Stream AP database responses larger than this (bytes)
+
+SHOWCMD_TMPL = "https://{ip}:4343/v1/configuration/showcommand?command={cmd}&UIDARUBA={uid}"
+SHOWCMD_TIMEOUT = (5, 15)  # (connect, read) seconds, so an unreachable controller can't stall a worker
+
+# Section banners for console output
+_BANNER_WIDE = "=" * 80
+_BANNER_EQ = "=" * 60
+_BANNER_DASH = "-" * 50
+_BANNER_DASH_WIDE = "-" * 80
+_BANNER_EQ_NARROW = "=" * 50
+
+# Header/summary markers skipped by the text fallback of parse_ap_convert_status
+_CONVERT_SKIP_KEYWORDS = ("AP Name", "------", "Status", "Total APs", "No APs", "AP Group", "AP Mac")
+_CONVERT_SUMMARY_KEYWORDS = ("Total", "Completed", "Failed", "In-Progress")
+_CONVERT_SKIP_RE = re.compile("|".join(map(re.escape, _CONVERT_SKIP_KEYWORDS)))
+_CONVERT_SUMMARY_RE = re.compile("|".join(map(re.escape, _CONVERT_SUMMARY_KEYWORDS)))
+
+# Line patterns in "show lc-cluster group-membership" output
+_PROFILE_RE = re.compile(r"Profile Name =\s*(.*\S)")
+_LEADER_RE = re.compile(r"self.*CONNECTED \(Leader\)")
+_PEER_RE = re.compile(r"\bpeer\s+(\S+)")
+
+# Prompt or banner text shown once the CLI is inside an LC cluster profile (covers all case variants)
+_CLUSTER_CTX_RE = re.compile(r"lc-cluster-profile|Classic Controller Cluster Profile", re.IGNORECASE)
+
+# Markers of a rejected CLI command (whole words, so e.g. "Invalidated" does not count)
+_CLI_ERROR_RE = re.compile(r"\b(?:Error|Invalid)\b")
+
+# Confirmation asked by the ap convert commands
+_CONFIRM_RE = re.compile(r"Do you want to proceed with the operation\?\s*\[y/n\]:")
+
+# End of SSH output once the device is waiting for input: CLI prompt or [y/n] confirmation
+_CLI_PROMPT_RE = re.compile(rb"[#>]\s*$")
+_SSH_PROMPT_RE = re.compile(rb"(?:[#>]|\[y/n\]:)\s*$")
+# End of an AOS prompt anywhere in the output, e.g. "(host) [mynode] (config) #"
+_PROMPT_MARK_RE = re.compile(r"[)\]] ?[#>]")
+
+def ask(prompt, default='n'):
+    """Ask a y/n style question, returning the lowercased answer or default when left empty"""
+    answer = input(prompt).strip().lower()
+    return answer or default
+
+def parse_response(response):
+    """Decode a JSON API response, using orjson when it is installed"""
+    if orjson:
+        return orjson.loads(response.content)
+    return response.json()
+
 def login(ip, username, password):
     url = f"https://{ip}:4343/v1/api/login"
     payload = {"username": username, "password": password}
     session = requests.Session()
-    response = session.post(url, data=payload, verify=False)
+    session.mount("https://", _shared_adapter)
+    session.verify = False
+    session.trust_env = False
+    response = session.post(url, data=payload)
     
     if response.ok:
-        result = response.json()
+        result = parse_response(response)
         if '_global_result' in result and result['_global_result']['status'] == "0":  # String "0"
             print(f"Login successful to {ip}!")
             
             # Extract tokens from the JSON response body
             uid = result['_global_result'].get('UIDARUBA')
             token = result['_global_result'].get('X-CSRF-Token')
+            if token:
+                session.headers["X-CSRF-Token"] = token
             
             return session, token, uid
     
     print(f"Login failed to {ip}:", response.text)
     return None, None, None
 
+def get_session(ip, username, password):
+    """Return the cached authenticated session for a controller, logging in if needed"""
+    cached = _session_cache.get(ip)
+    if cached:
+        return cached
+    
+    session, token, uid = login(ip, username, password)
+    if session:
+        _session_cache[ip] = (session, token, uid)
+    return session, token, uid
+
+def fetch_show_command(ip, username, password, command):
+    """Run a show command over the cached session, logging in again once if it has expired"""
+    for attempt in range(2):
+        session, token, uid = get_session(ip, username, password)
+        
+        if not session:
+            return None
+        
+        try:
+            response = session.get(SHOWCMD_TMPL.format(ip=ip, cmd=command, uid=uid), timeout=SHOWCMD_TIMEOUT)
+        except requests.exceptions.Timeout:
+            print(f"Timed out running {command} on {ip}")
+            return None
+        
+        # Session expired on the controller - drop it and log in again
+        if response.status_code in (401, 403) and attempt == 0:
+            _session_cache.pop(ip, None)
+            continue
+        
+        return response
+
 def fetch_switch_data(session, ip, token, uid):
     # Append the UIDARUBA token in the URL as required by the API
-    url = f"https://{ip}:4343/v1/configuration/showcommand?command=show+switches+debug&UIDARUBA={uid}"
-    
-    headers = {}
-    if token:
-        headers["X-CSRF-Token"] = token
-    
-    response = session.get(url, headers=headers, verify=False)
+    response = session.get(SHOWCMD_TMPL.format(ip=ip, cmd="show+switches+debug", uid=uid), timeout=SHOWCMD_TIMEOUT)
     
     if response.ok:
-        data = response.json()
+        data = parse_response(response)
         return data
     else:
         print("Failed to fetch data:", response.text)
@@ -113,23 +230,14 @@ def filter_md_switches(data):
     return md_list
 
 def fetch_lc_cluster_info(controller_ip, username, password):
-    # Login to the controller
-    session, token, uid = login(controller_ip, username, password)
-    
-    if not session:
-        return None
-    
     # Make API call to get LC cluster information
-    url = f"https://{controller_ip}:4343/v1/configuration/showcommand?command=show+lc-cluster+group-membership&UIDARUBA={uid}"
+    response = fetch_show_command(controller_ip, username, password, "show+lc-cluster+group-membership")
     
-    headers = {}
-    if token:
-        headers["X-CSRF-Token"] = token
-    
-    response = session.get(url, headers=headers, verify=False)
+    if response is None:
+        return None
     
     if response.ok:
-        data = response.json()
+        data = parse_response(response)
         return data
     else:
         print(f"Failed to fetch LC cluster info from {controller_ip}:", response.text)
@@ -143,61 +251,55 @@ def parse_lc_cluster_info(cluster_data):
     }
     
     if "_data" in cluster_data:
+        found_name = False
         for line in cluster_data["_data"]:
             if isinstance(line, str):
-                if "Profile Name =" in line:
-                    parts = line.split("Profile Name =")
-                    if len(parts) > 1:
-                        cluster_info["cluster_name"] = parts[1].strip()
+                # The profile name and leader status only need to be found once
+                if not found_name:
+                    match = _PROFILE_RE.search(line)
+                    if match:
+                        cluster_info["cluster_name"] = match.group(1)
+                        found_name = True
                 
                 # Check for self and leader status
-                if "self" in line and "CONNECTED (Leader)" in line:
+                if not cluster_info["is_leader"] and _LEADER_RE.search(line):
                     cluster_info["is_leader"] = True
                 
                 # Check for peer entries
-                if "peer" in line:
-                    parts = line.split()
-                    if len(parts) > 1:
-                        ip_address = parts[1].strip()
-                        cluster_info["members"].append(ip_address)
+                match = _PEER_RE.search(line)
+                if match:
+                    cluster_info["members"].append(match.group(1))
     
     return cluster_info
 
 def fetch_ap_groups(controller_ip, username, password):
-    # Login to the controller
-    session, token, uid = login(controller_ip, username, password)
-    
-    if not session:
-        return None
-    
     # Make API call to get AP groups
-    url = f"https://{controller_ip}:4343/v1/configuration/showcommand?command=show+ap-group&UIDARUBA={uid}"
-    
-    headers = {}
-    if token:
-        headers["X-CSRF-Token"] = token
+    response = fetch_show_command(controller_ip, username, password, "show+ap-group")
     
-    response = session.get(url, headers=headers, verify=False)
+    if response is None:
+        return None
     
     if response.ok:
-        data = response.json()
+        data = parse_response(response)
         return data
     else:
         print(f"Failed to fetch AP groups from {controller_ip}:", response.text)
         return None
 
 def fetch_ap_database(session, ip, token, uid):
-    """Fetch AP database from Mobility Conductor"""
-    url = f"https://{ip}:4343/v1/configuration/showcommand?command=show+ap+database+long&UIDARUBA={uid}"
-    
-    headers = {}
-    if token:
-        headers["X-CSRF-Token"] = token
-    
-    response = session.get(url, headers=headers, verify=False)
+    """Fetch AP database from Mobility Conductor, streaming the AP list when it is large"""
+    response = session.get(SHOWCMD_TMPL.format(ip=ip, cmd="show+ap+database+long", uid=uid),
+                           stream=True, timeout=SHOWCMD_TIMEOUT)
     
     if response.ok:
-        data = response.json()
+        # Unknown (chunked) or large responses are parsed incrementally so the
+        # full AP list never has to be held in memory at once
+        content_length = int(response.headers.get("Content-Length", 0))
+        if ijson and (content_length == 0 or content_length > AP_DATABASE_STREAM_THRESHOLD):
+            response.raw.decode_content = True
+            return {"AP Database": ijson.items(response.raw, "AP Database.item")}
+        
+        data = parse_response(response)
         return data
     else:
         print(f"Failed to fetch AP database:", response.text)
@@ -205,23 +307,14 @@ def fetch_ap_database(session, ip, token, uid):
 def fetch_ap_convert_status(controller_ip, username, password):
     """Fetch AP convert status from a specific controller"""
     try:
-        # Login to the controller
-        session, token, uid = login(controller_ip, username, password)
-        
-        if not session:
-            return None
-        
         # Make API call to get AP convert status
-        url = f"https://{controller_ip}:4343/v1/configuration/showcommand?command=show+ap+convert-status&UIDARUBA={uid}"
-        
-        headers = {}
-        if token:
-            headers["X-CSRF-Token"] = token
+        response = fetch_show_command(controller_ip, username, password, "show+ap+convert-status")
         
-        response = session.get(url, headers=headers, verify=False)
+        if response is None:
+            return None
         
         if response.ok:
-            data = response.json()
+            data = parse_response(response)
             return data
         else:
             print(f"Failed to fetch AP convert status from {controller_ip}:", response.text)
@@ -231,8 +324,14 @@ def fetch_ap_convert_status(controller_ip, username, password):
         print(f"Error fetching AP convert status from {controller_ip}: {str(e)}")
         return None
 
-def parse_ap_convert_status(convert_status_data):
-    """Parse AP convert status data and return list of converting APs and summary info"""
+def parse_ap_convert_status(convert_status_data, now=None):
+    """Parse AP convert status data and return list of converting APs and summary info
+    
+    Handles the structured response ("AP Conversion Parameters", "AP Groups Listed
+    for Conversion", "AP Image Conversion Status") and, only when no structured AP
+    entries are present, falls back to scanning the text lines in "_data".
+    `now` timestamps every AP entry; the dashboard passes its refresh time so a cycle shares one clock read.
+    """
     converting_aps = []
     conversion_summary = {
         'status': 'Unknown',
@@ -247,6 +346,9 @@ def parse_ap_convert_status(convert_status_data):
     if not convert_status_data:
         return converting_aps, conversion_summary
     
+    if now is None:
+        now = datetime.now()
+    
     # Parse conversion parameters
     if "AP Conversion Parameters" in convert_status_data:
         for param in convert_status_data["AP Conversion Parameters"]:
@@ -273,7 +375,7 @@ def parse_ap_convert_status(convert_status_data):
                 conversion_summary['ap_groups'].append(group["AP Groups"])
     
     # Parse currently converting APs from "AP Image Conversion Status"
-    if "AP Image Conversion Status" in convert_status_data:
+    if convert_status_data.get("AP Image Conversion Status"):
         for ap_entry in convert_status_data["AP Image Conversion Status"]:
             if isinstance(ap_entry, dict):
                 # Extract AP information from the structured data
@@ -288,28 +390,24 @@ def parse_ap_convert_status(convert_status_data):
                     'mac': ap_mac,
                     'status': upgrade_state,
                     'progress': failure_reason if failure_reason else "In Progress",
-                    'timestamp': datetime.now(),
+                    'timestamp': now,
                     'start_time': start_time
                 })
     
-    # Also check _data for any text-based AP entries (fallback)
-    if "_data" in convert_status_data and convert_status_data["_data"]:
+    # Otherwise check _data for any text-based AP entries (fallback)
+    elif convert_status_data.get("_data"):
         for line in convert_status_data["_data"]:
             if isinstance(line, str) and line.strip():
                 # Skip header lines and empty lines
-                if any(skip_text in line for skip_text in [
-                    "AP Name", "------", "Status", "Total APs", "No APs", "AP Group", "AP Mac"
-                ]):
+                if _CONVERT_SKIP_RE.search(line):
                     continue
                 
                 # Parse AP entries - format varies
-                parts = line.strip().split()
+                parts = line.split()
                 if len(parts) >= 3:
                     ap_name = parts[0]
                     # Skip if this looks like a summary line
-                    if ap_name and not any(summary_text in ap_name for summary_text in [
-                        "Total", "Completed", "Failed", "In-Progress"
-                    ]):
+                    if ap_name and not _CONVERT_SUMMARY_RE.search(ap_name):
                         mac_address = parts[1] if len(parts) > 1 else "Unknown"
                         status = parts[2] if len(parts) > 2 else "Unknown"
                         progress = " ".join(parts[3:]) if len(parts) > 3 else ""
@@ -319,10 +417,22 @@ def parse_ap_convert_status(convert_status_data):
                             'mac': mac_address,
                             'status': status,
                             'progress': progress,
-                            'timestamp': datetime.now()
+                            'timestamp': now
                         })
     
     return converting_aps, conversion_summary
+class APRecord:
+    """Tracking record for an AP seen during conversion monitoring"""
+    __slots__ = ('first_seen', 'last_seen', 'controller', 'mac', 'status_history', 'completed_time')
+    
+    def __init__(self, first_seen, controller, mac):
+        self.first_seen = first_seen
+        self.last_seen = first_seen
+        self.controller = controller
+        self.mac = mac
+        self.status_history = deque(maxlen=200)  # Capped so long runs don't grow unbounded
+        self.completed_time = None
+
 def track_conversion_progress(controller_name, conversion_summary, all_time_data):
     """Track conversion progress and estimate completed APs based on summary data"""
     controller_key = f"{controller_name}"
@@ -363,28 +473,37 @@ def track_conversion_progress(controller_name, conversion_summary, all_time_data
     
     return controller_data
 def get_cluster_controllers_for_monitoring():
-    """Get all controllers in the selected cluster for monitoring"""
+    """Get all controllers in the selected cluster for monitoring (cached per cluster)"""
     global selected_cluster
     
     if not selected_cluster:
         return []
     
-    controllers = get_controllers_by_cluster(selected_cluster)
+    controllers = _cluster_controllers_cache.get(selected_cluster)
+    if controllers is None:
+        controllers = get_controllers_by_cluster(selected_cluster)
+        _cluster_controllers_cache[selected_cluster] = controllers
     return controllers
 
-def monitor_ap_conversion():
-    """Monitor AP conversion status across all controllers in the selected cluster"""
-    global monitoring_active, mc_username, mc_password
+def invalidate_controller_cache():
+    """Drop cached controller and cluster lists so they are re-read from the database"""
+    global _all_controllers_cache, _clusters_with_nodepaths_cache
+    _cluster_controllers_cache.clear()
+    _all_controllers_cache = None
+    _clusters_with_nodepaths_cache = None
+
+def monitor_ap_conversion(controllers):
+    """Monitor AP conversion status across the given controllers in the selected cluster"""
+    # Bind shared state locally so the refresh loop doesn't go through globals
+    cluster_name = selected_cluster
+    username, password = mc_username, mc_password
     
-    print(f"\n{'='*80}")
+    print(f"\n{_BANNER_WIDE}")
     print("LIVE AP CONVERSION MONITORING DASHBOARD")
-    print(f"{'='*80}")
-    print(f"Monitoring Cluster: {selected_cluster}")
+    print(_BANNER_WIDE)
+    print(f"Monitoring Cluster: {cluster_name}")
     print("Press Ctrl+C to stop monitoring and return to main menu")
-    print(f"{'='*80}")
-    
-    # Get controllers to monitor
-    controllers = get_cluster_controllers_for_monitoring()
+    print(_BANNER_WIDE)
     
     if not controllers:
         print("No controllers found for monitoring.")
@@ -395,15 +514,19 @@ def monitor_ap_conversion():
         print(f"  - {controller['name']} ({controller['ip_address']})")
     
     # Initialize tracking variables
-    all_time_aps = {}  # Track all APs we've ever seen
+    all_time_aps = {}  # Track all APs we've ever seen (AP name -> APRecord)
+    controller_progress_data = {}  # Conversion progress per controller
     completed_aps = set()  # APs that are no longer in the conversion list
+    recent_completed = deque(maxlen=10)  # Most recently completed APs, for display
     previous_converting = set()  # APs that were converting in the last check
+    controller_table_rows = None  # Rows behind the cached controller status table
+    controller_table_text = ""
     
     start_time = datetime.now()
     check_count = 0
     
     try:
-        while monitoring_active:
+        while not _stop_event.is_set():
             check_count += 1
             current_time = datetime.now()
             elapsed_time = current_time - start_time
@@ -411,14 +534,14 @@ def monitor_ap_conversion():
             # Clear screen for dashboard refresh
             os.system('cls' if os.name == 'nt' else 'clear')
             
-            print(f"\n{'='*80}")
+            print(f"\n{_BANNER_WIDE}")
             print("🔄 LIVE AP CONVERSION MONITORING DASHBOARD")
-            print(f"{'='*80}")
-            print(f"Cluster: {selected_cluster}")
+            print(_BANNER_WIDE)
+            print(f"Cluster: {cluster_name}")
             print(f"Runtime: {str(elapsed_time).split('.')[0]}")
             print(f"Last Update: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Refresh Count: {check_count}")
-            print(f"{'='*80}")
+            print(_BANNER_WIDE)
             
             # Collect current status from all controllers
             current_converting = set()
@@ -426,79 +549,82 @@ def monitor_ap_conversion():
             total_api_calls = 0
             successful_api_calls = 0
             
-            for controller in controllers:
-                controller_ip = controller['ip_address']
-                controller_name = controller['name']
-                
-                print(f"📡 Querying {controller_name}...", end=" ", flush=True)
-                
-                # Fetch AP convert status
-                convert_data = fetch_ap_convert_status(controller_ip, mc_username, mc_password)
-                total_api_calls += 1
+            status_lines = []  # Per-controller query results, written out once
+            
+            # Query all controllers in parallel; results are merged on this thread in
+            # controller order so table rows stay put between refreshes
+            with ThreadPoolExecutor(max_workers=min(32, len(controllers))) as executor:
+                results = executor.map(
+                    lambda controller: fetch_ap_convert_status(controller['ip_address'], username, password),
+                    controllers
+                )
                 
-                if convert_data:
-                    successful_api_calls += 1
-                    converting_aps, conversion_summary = parse_ap_convert_status(convert_data)
-                    
-                    # Track conversion progress for this controller
-                    controller_progress = track_conversion_progress(controller_name, conversion_summary, all_time_aps)
-                    
-                    controller_status[controller_name] = {
-                        'status': 'Online',
-                        'aps': converting_aps,
-                        'count': len(converting_aps),
-                        'summary': conversion_summary,
-                        'progress': controller_progress
-                    }
+                for controller, convert_data in zip(controllers, results):
+                    controller_name = controller['name']
+                    total_api_calls += 1
                     
-                    # Add to current converting set
-                    for ap in converting_aps:
-                        ap_name = ap['name']
-                        current_converting.add(ap_name)
+                    if convert_data:
+                        successful_api_calls += 1
+                        converting_aps, conversion_summary = parse_ap_convert_status(convert_data, now=current_time)
                         
-                        # Track this AP
-                        if ap_name not in all_time_aps:
-                            all_time_aps[ap_name] = {
-                                'first_seen': current_time,
-                                'last_seen': current_time,
-                                'controller': controller_name,
-                                'mac': ap['mac'],
-                                'status_history': []
-                            }
+                        # Track conversion progress for this controller
+                        controller_progress = track_conversion_progress(controller_name, conversion_summary, controller_progress_data)
                         
-                        all_time_aps[ap_name]['last_seen'] = current_time
-                        all_time_aps[ap_name]['status_history'].append({
-                            'time': current_time,
-                            'status': ap['status'],
-                            'progress': ap['progress']
-                        })
-                    
-                    print("✅")
-                else:
-                    controller_status[controller_name] = {
-                        'status': 'Offline/Error',
-                        'aps': [],
-                        'count': 0,
-                        'summary': {},
-                        'progress': {}
-                    }
-                    print("❌")
+                        controller_status[controller_name] = {
+                            'status': 'Online',
+                            'aps': converting_aps,
+                            'count': len(converting_aps),
+                            'summary': conversion_summary,
+                            'progress': controller_progress
+                        }
+                        
+                        # Add to current converting set
+                        for ap in converting_aps:
+                            ap_name = ap['name']
+                            current_converting.add(ap_name)
+                            
+                            # Track this AP
+                            ap_record = all_time_aps.get(ap_name)
+                            if ap_record is None:
+                                ap_record = all_time_aps[ap_name] = APRecord(current_time, controller_name, ap['mac'])
+                            
+                            ap_record.last_seen = current_time
+                            ap_record.status_history.append({
+                                'time': current_time,
+                                'status': ap['status'],
+                                'progress': ap['progress']
+                            })
+                        
+                        status_lines.append(f"📡 {controller_name}: ✅")
+                    else:
+                        controller_status[controller_name] = {
+                            'status': 'Offline/Error',
+                            'aps': [],
+                            'count': 0,
+                            'summary': {},
+                            'progress': {}
+                        }
+                        status_lines.append(f"📡 {controller_name}: ❌")
+            
+            sys.stdout.write("\n".join(status_lines) + "\n")
             
             # Identify newly completed APs
             newly_completed = previous_converting - current_converting
             if newly_completed:
+                recent_completed.extend(newly_completed - completed_aps)
+                completed_aps |= newly_completed
                 for ap_name in newly_completed:
-                    completed_aps.add(ap_name)
                     if ap_name in all_time_aps:
-                        all_time_aps[ap_name]['completed_time'] = current_time
+                        all_time_aps[ap_name].completed_time = current_time
             
-            # Update previous_converting for next iteration
-            previous_converting = current_converting.copy()
+            # Update previous_converting for next iteration; current_converting
+            # is rebuilt as a new set each cycle so no copy is needed
+            previous_converting = current_converting
             
-            # Display controller status
-            print(f"\n📊 CONTROLLER STATUS:")
-            print("-" * 80)
+            # Build the status and conversion detail tables in a single pass
             controller_table = []
+            conversion_details_table = []
+            total_estimated_processed = 0
             
             for controller_name, status in controller_status.items():
                 controller_table.append([
@@ -506,14 +632,37 @@ def monitor_ap_conversion():
                     status['status'],
                     status['count']
                 ])
+                
+                summary = status['summary']
+                if summary:
+                    summary_get = summary.get
+                    estimated_processed = status['progress'].get('total_processed_estimate', 0)
+                    total_estimated_processed += estimated_processed
+                    
+                    conversion_details_table.append([
+                        controller_name,
+                        summary_get('current_status', 'Unknown'),
+                        f"{summary_get('current_converting', 0)}/{summary_get('max_converting', 0)}",
+                        ', '.join(summary_get('ap_groups', [])),
+                        estimated_processed,
+                        summary_get('start_time', 'Unknown')
+                    ])
             
-            print(tabulate(controller_table, 
-                         headers=['Controller', 'API Status', 'Converting APs'], 
-                         tablefmt='grid'))
+            # Display controller status
+            print(f"\n📊 CONTROLLER STATUS:")
+            print(_BANNER_DASH_WIDE)
+            
+            # Only re-render the table when its contents have changed
+            if controller_table != controller_table_rows:
+                controller_table_rows = controller_table
+                controller_table_text = tabulate(controller_table, 
+                                                 headers=['Controller', 'API Status', 'Converting APs'], 
+                                                 tablefmt='grid')
+            print(controller_table_text)
             
             # Display enhanced conversion summary
             print(f"\n📈 CONVERSION SUMMARY:")
-            print("-" * 80)
+            print(_BANNER_DASH_WIDE)
             print(f"🔄 Currently Converting: {len(current_converting)} APs")
             print(f"✅ Completed: {len(completed_aps)} APs")
             print(f"📋 Total Tracked: {len(all_time_aps)} APs")
@@ -521,26 +670,7 @@ def monitor_ap_conversion():
             
             # Display per-controller conversion details
             print(f"\n🏗️  CONTROLLER CONVERSION DETAILS:")
-            print("-" * 80)
-            conversion_details_table = []
-            total_estimated_processed = 0
-            
-            for controller_name, status in controller_status.items():
-                if 'summary' in status and status['summary']:
-                    summary = status['summary']
-                    progress = status.get('progress', {})
-                    
-                    estimated_processed = progress.get('total_processed_estimate', 0)
-                    total_estimated_processed += estimated_processed
-                    
-                    conversion_details_table.append([
-                        controller_name,
-                        summary.get('current_status', 'Unknown'),
-                        f"{summary.get('current_converting', 0)}/{summary.get('max_converting', 0)}",
-                        ', '.join(summary.get('ap_groups', [])),
-                        estimated_processed,
-                        summary.get('start_time', 'Unknown')
-                    ])
+            print(_BANNER_DASH_WIDE)
             
             if conversion_details_table:
                 print(tabulate(conversion_details_table,
@@ -555,54 +685,54 @@ def monitor_ap_conversion():
             # Display recently completed APs
             if completed_aps:
                 print(f"\n✅ COMPLETED APs ({len(completed_aps)}):")
-                print("-" * 80)
+                print(_BANNER_DASH_WIDE)
                 completed_table = []
                 
-                for ap_name in sorted(completed_aps):
+                for ap_name in recent_completed:
                     if ap_name in all_time_aps:
                         ap_info = all_time_aps[ap_name]
-                        completed_time = ap_info.get('completed_time', 'Unknown')
+                        completed_time = ap_info.completed_time
                         duration = "Unknown"
                         
-                        if completed_time != 'Unknown' and 'first_seen' in ap_info:
-                            duration = str(completed_time - ap_info['first_seen']).split('.')[0]
+                        if completed_time is not None:
+                            duration = str(completed_time - ap_info.first_seen).split('.')[0]
                         
                         completed_table.append([
                             ap_name,
-                            ap_info.get('controller', 'Unknown'),
-                            ap_info.get('mac', 'Unknown'),
-                            completed_time.strftime('%H:%M:%S') if completed_time != 'Unknown' else 'Unknown',
+                            ap_info.controller or 'Unknown',
+                            ap_info.mac or 'Unknown',
+                            completed_time.strftime('%H:%M:%S') if completed_time is not None else 'Unknown',
                             duration
                         ])
                 
                 if completed_table:
-                    # Show only the last 10 completed APs to keep the display manageable
-                    display_completed = completed_table[-10:] if len(completed_table) > 10 else completed_table
-                    print(tabulate(display_completed,
+                    # Only the last 10 completed APs are kept to keep the display manageable
+                    print(tabulate(completed_table,
                                  headers=['AP Name', 'Controller', 'MAC Address', 'Completed At', 'Total Duration'],
                                  tablefmt='grid'))
                     
-                    if len(completed_table) > 10:
-                        print(f"... and {len(completed_table) - 10} more completed APs")
+                    if len(completed_aps) > len(completed_table):
+                        print(f"... and {len(completed_aps) - len(completed_table)} more completed APs")
             
-            print(f"\n{'='*80}")
+            print(f"\n{_BANNER_WIDE}")
             print("⏱️  Refreshing in 10 seconds... (Press Ctrl+C to stop monitoring)")
-            print(f"{'='*80}")
+            print(_BANNER_WIDE)
             
-            # Wait for next refresh
-            time.sleep(10)
+            # Wait for next refresh, returning early if monitoring is stopped
+            if _stop_event.wait(10):
+                break
             
     except KeyboardInterrupt:
         print(f"\n\n🛑 Monitoring stopped by user.")
     except Exception as e:
         print(f"\n\n❌ Error during monitoring: {str(e)}")
     finally:
-        monitoring_active = False
+        _stop_event.set()
         
         # Display final summary
-        print(f"\n{'='*80}")
+        print(f"\n{_BANNER_WIDE}")
         print("📊 FINAL MONITORING SUMMARY")
-        print(f"{'='*80}")
+        print(_BANNER_WIDE)
         print(f"Total Runtime: {str(datetime.now() - start_time).split('.')[0]}")
         print(f"Total Refresh Cycles: {check_count}")
         print(f"Total APs Tracked: {len(all_time_aps)}")
@@ -616,11 +746,11 @@ def monitor_ap_conversion():
             print(f"\n⚠️  {len(current_converting)} APs are still converting.")
             print("You may want to continue monitoring or check controller status manually.")
         
-        print(f"{'='*80}")
+        print(_BANNER_WIDE)
 
 def start_monitoring_dashboard():
     """Start the monitoring dashboard in a controlled manner"""
-    global monitoring_active, selected_cluster, mc_username, mc_password
+    global selected_cluster, mc_username, mc_password
     
     if not selected_cluster:
         print("No cluster selected. Please select a cluster first (option 4).")
@@ -640,21 +770,185 @@ def start_monitoring_dashboard():
     print(f"Controllers to monitor: {len(controllers)}")
     
     # Confirm start
-    confirm = input("Start live monitoring dashboard? (y/n): ")
-    if confirm.lower() != 'y':
+    if ask("Start live monitoring dashboard? (y/n): ") != 'y':
         print("Monitoring cancelled.")
         return False
     
-    # Set monitoring flag and start
-    monitoring_active = True
+    # Clear the stop signal and start
+    _stop_event.clear()
     
     try:
-        monitor_ap_conversion()
+        monitor_ap_conversion(controllers)
     except Exception as e:
         print(f"Error during monitoring: {str(e)}")
-        monitoring_active = False
+        _stop_event.set()
     
     return True
+DB_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+PRAGMA busy_timeout=5000;
+"""
+
+# Tables and lookup indexes (controllers.ip_address is indexed by its UNIQUE constraint)
+DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS controllers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ip_address TEXT UNIQUE,
+    name TEXT,
+    nodepath TEXT,
+    model TEXT,
+    version TEXT,
+    added_on TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS lc_clusters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    controller_id INTEGER,
+    cluster_name TEXT,
+    is_leader BOOLEAN,
+    members TEXT,
+    added_on TIMESTAMP,
+    FOREIGN KEY (controller_id) REFERENCES controllers(id)
+);
+
+CREATE TABLE IF NOT EXISTS ap_groups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    controller_id INTEGER,
+    name TEXT,
+    profile_status TEXT,
+    added_on TIMESTAMP,
+    FOREIGN KEY (controller_id) REFERENCES controllers(id)
+);
+
+CREATE TABLE IF NOT EXISTS ap_types (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ap_type TEXT UNIQUE,
+    count INTEGER,
+    added_on TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_controllers_nodepath ON controllers(nodepath);
+CREATE INDEX IF NOT EXISTS idx_controllers_name ON controllers(name);
+CREATE INDEX IF NOT EXISTS idx_lc_clusters_controller_id ON lc_clusters(controller_id);
+CREATE INDEX IF NOT EXISTS idx_lc_clusters_cluster_name ON lc_clusters(cluster_name);
+CREATE INDEX IF NOT EXISTS idx_ap_groups_controller_id ON ap_groups(controller_id);
+"""
+
+# Lookup queries, kept as module constants so sqlite3's statement cache reuses the compiled statements
+
+# Named clusters on a nodepath
+SQL_CLUSTERS_FOR_NODEPATH = '''
+SELECT DISTINCT lc.cluster_name FROM lc_clusters lc
+JOIN controllers c ON c.id = lc.controller_id
+WHERE c.nodepath = ?
+AND lc.cluster_name != 'Unknown' AND lc.cluster_name IS NOT NULL
+'''
+
+# Every cluster name, including 'Unknown'
+SQL_ALL_CLUSTER_NAMES_INCLUDING_UNKNOWN = '''
+SELECT DISTINCT cluster_name FROM lc_clusters
+'''
+
+# Named clusters with their nodepaths
+SQL_CLUSTERS_WITH_NODEPATHS = '''
+SELECT DISTINCT lc.cluster_name, c.nodepath
+FROM lc_clusters lc
+JOIN controllers c ON lc.controller_id = c.id
+WHERE lc.cluster_name != 'Unknown' AND lc.cluster_name IS NOT NULL
+'''
+
+# Named clusters
+SQL_CLUSTER_NAMES = '''
+SELECT DISTINCT cluster_name FROM lc_clusters
+WHERE cluster_name != 'Unknown' AND cluster_name IS NOT NULL
+'''
+
+# Nodepath of the first controller in a cluster
+SQL_NODEPATH_FOR_CLUSTER = '''
+SELECT c.nodepath FROM lc_clusters lc
+JOIN controllers c ON c.id = lc.controller_id
+WHERE lc.cluster_name = ?
+ORDER BY c.id
+LIMIT 1
+'''
+
+# Cluster of a controller, by controller name
+SQL_CLUSTER_FOR_CONTROLLER = '''
+SELECT lc.cluster_name FROM controllers c
+JOIN lc_clusters lc ON lc.controller_id = c.id
+WHERE c.name = ?
+ORDER BY c.id
+LIMIT 1
+'''
+
+# Any cluster on a nodepath
+SQL_LC_CLUSTER_FOR_NODEPATH = '''
+SELECT DISTINCT lc.cluster_name FROM lc_clusters lc
+JOIN controllers c ON c.id = lc.controller_id
+WHERE c.nodepath = ?
+'''
+
+# Controllers in a cluster
+SQL_CONTROLLERS_BY_CLUSTER = '''
+SELECT DISTINCT c.id, c.ip_address, c.name, c.nodepath FROM controllers c
+JOIN lc_clusters lc ON lc.controller_id = c.id
+WHERE lc.cluster_name = ?
+ORDER BY c.id
+'''
+
+# AP groups across a cluster, de-duplicated and sorted
+SQL_AP_GROUPS_FOR_CLUSTER = '''
+SELECT DISTINCT g.name FROM ap_groups g
+JOIN lc_clusters lc ON lc.controller_id = g.controller_id
+WHERE lc.cluster_name = ?
+ORDER BY g.name
+'''
+
+# INSERT ... ON CONFLICT DO UPDATE needs SQLite 3.24, INSERT ... RETURNING 3.35
+SQLITE_HAS_UPSERT = sqlite3.sqlite_version_info >= (3, 24)
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+
+def open_db():
+    """Open the migration database with WAL journaling, relaxed syncing and a memory-mapped cache"""
+    conn = sqlite3.connect('aruba_migration.db', check_same_thread=False, cached_statements=256)
+    conn.executescript(DB_PRAGMAS)
+    return conn
+
+def get_conn():
+    """Return the shared database connection, opening it on first use"""
+    global _db_conn
+    
+    if _db_conn is None:
+        with _db_conn_lock:
+            if _db_conn is None:
+                conn = open_db()
+                conn.row_factory = sqlite3.Row
+                atexit.register(conn.close)
+                _db_conn = conn
+    return _db_conn
+
+def tuple_cursor():
+    """Return a cursor that yields plain tuples, for queries that don't need sqlite3.Row lookups"""
+    cursor = get_conn().cursor()
+    cursor.row_factory = None
+    return cursor
+
+@contextmanager
+def migration_transaction():
+    """Group a batch of store_* calls into one transaction, committed once at the end"""
+    conn = get_conn()
+    conn.execute('BEGIN')
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
 def clear_database():
     """Clear all data from the database tables"""
     db_path = 'aruba_migration.db'
@@ -662,17 +956,20 @@ def clear_database():
     if os.path.exists(db_path):
         print("Clearing existing database...")
         try:
-            conn = sqlite3.connect(db_path)
+            conn = get_conn()
             cursor = conn.cursor()
             
-            # Clear all tables
-            cursor.execute('DELETE FROM ap_types')
-            cursor.execute('DELETE FROM ap_groups') 
-            cursor.execute('DELETE FROM lc_clusters')
-            cursor.execute('DELETE FROM controllers')
+            # Clear all tables in a single transaction
+            cursor.executescript('''
+            BEGIN;
+            DELETE FROM ap_types;
+            DELETE FROM ap_groups;
+            DELETE FROM lc_clusters;
+            DELETE FROM controllers;
+            COMMIT;
+            ''')
             
-            conn.commit()
-            conn.close()
+            invalidate_controller_cache()
             print("✓ Database cleared successfully.")
         except Exception as e:
             print(f"Error clearing database: {str(e)}")
@@ -680,45 +977,42 @@ def clear_database():
         print("No existing database found.")
         
 def count_ap_types(ap_database_data):
-    """Count AP types from AP database data"""
-    type_counts = {}
+    """Count AP types from AP database data (the AP list may be a list or a streaming iterator)"""
+    type_counts = Counter()
     
-    # Debug - print structure of the response
-    print("\nDebug - AP Database Response Structure:")
-    print(f"Response Keys: {ap_database_data.keys() if isinstance(ap_database_data, dict) else 'Not a dictionary'}")
+    # Debug - log structure of the response
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("AP Database response keys: %s",
+                     ap_database_data.keys() if isinstance(ap_database_data, dict) else 'Not a dictionary')
     
     # Check if we have the AP Database key in the response
     if not isinstance(ap_database_data, dict) or "AP Database" not in ap_database_data:
         print("AP Database key not found in response.")
         
         # If there's _data key, let's check its contents as a fallback
-        if "_data" in ap_database_data:
-            print("Found _data key, checking contents...")
-            for line in ap_database_data["_data"][:5]:  # Print first 5 lines for debugging
-                print(f"Line: {line}")
+        if logger.isEnabledFor(logging.DEBUG) and "_data" in ap_database_data:
+            logger.debug("Found _data key, checking contents...")
+            for line in ap_database_data["_data"][:5]:  # Log first 5 lines for debugging
+                logger.debug("Line: %s", line)
             
         return type_counts
     
-    # Get the AP Database array
-    ap_database = ap_database_data["AP Database"]
-    print(f"Found {len(ap_database)} APs in the database")
-    
-    # Print sample data for debugging
-    if len(ap_database) > 0:
-        print("Sample AP entry:")
-        print(ap_database[0])
-    
-    # Count AP types from the structured data
-    for ap in ap_database:
-        if isinstance(ap, dict) and "AP Type" in ap:
-            ap_type = ap["AP Type"]
-            if ap_type in type_counts:
-                type_counts[ap_type] += 1
-            else:
-                type_counts[ap_type] = 1
+    # Get the AP Database entries
+    ap_database = iter(ap_database_data["AP Database"])
+    
+    # Log sample data for debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        first_ap = next(ap_database, None)
+        if first_ap is not None:
+            logger.debug("Sample AP entry: %s", first_ap)
+            ap_database = itertools.chain([first_ap], ap_database)
     
+    # Count AP types from the structured data in a single pass
+    type_counts.update(ap["AP Type"] for ap in ap_database if isinstance(ap, dict) and "AP Type" in ap)
+    
+    print(f"Found {sum(type_counts.values())} APs in the database")
     print(f"Identified {len(type_counts)} different AP types")
-    print(f"AP Types found: {', '.join(type_counts.keys())}")
+    logger.debug("AP Types found: %s", ', '.join(type_counts.keys()))
     
     return type_counts
 
@@ -741,9 +1035,12 @@ def display_ap_type_counts(type_counts):
     total = sum(type_counts.values())
     print(f"\nTotal APs: {total}")
 
-def store_ap_type_counts(type_counts):
+def store_ap_type_counts(type_counts, conn=None):
     """Store AP type counts in the database"""
-    conn = sqlite3.connect('aruba_migration.db')
+    if conn is None:
+        # Standalone call: commit on its own
+        with get_conn() as conn:
+            return store_ap_type_counts(type_counts, conn)
     cursor = conn.cursor()
     
     # Check if the table exists, create if not
@@ -756,91 +1053,46 @@ def store_ap_type_counts(type_counts):
     )
     ''')
     
-    # Clear existing data
-    cursor.execute('DELETE FROM ap_types')
+    now = datetime.now()
+    rows = [(ap_type, count, now) for ap_type, count in type_counts.items()]
     
-    # Insert new data
-    for ap_type, count in type_counts.items():
-        cursor.execute('''
+    if not SQLITE_HAS_UPSERT:
+        # Replace existing data
+        cursor.execute('DELETE FROM ap_types')
+        cursor.executemany('''
         INSERT INTO ap_types (ap_type, count, added_on)
         VALUES (?, ?, ?)
-        ''', (ap_type, count, datetime.now()))
+        ''', rows)
+        return
     
-    conn.commit()
-    conn.close()
+    # Update counts in place for known AP types and insert new ones
+    cursor.executemany('''
+    INSERT INTO ap_types (ap_type, count, added_on)
+    VALUES (?, ?, ?)
+    ON CONFLICT(ap_type) DO UPDATE SET
+        count = excluded.count,
+        added_on = excluded.added_on
+    ''', rows)
+    
+    # Drop AP types that were not seen in this count
+    cursor.execute('DELETE FROM ap_types WHERE added_on != ?', (now,))
 
 def init_database():
     """Initialize the database and create tables if they don't exist"""
-    db_path = 'aruba_migration.db'
-    
-    # Create a new connection
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Check if controllers table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='controllers'")
-    table_exists = cursor.fetchone()
+    conn = get_conn()
     
-    if not table_exists:
-        print("Creating database tables...")
-        
-        # Create controllers table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS controllers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ip_address TEXT UNIQUE,
-            name TEXT,
-            nodepath TEXT,
-            model TEXT,
-            version TEXT,
-            added_on TIMESTAMP
-        )
-        ''')
-        
-        # Create lc_clusters table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS lc_clusters (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            controller_id INTEGER,
-            cluster_name TEXT,
-            is_leader BOOLEAN,
-            members TEXT,
-            added_on TIMESTAMP,
-            FOREIGN KEY (controller_id) REFERENCES controllers(id)
-        )
-        ''')
-        
-        # Create ap_groups table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ap_groups (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            controller_id INTEGER,
-            name TEXT,
-            profile_status TEXT,
-            added_on TIMESTAMP,
-            FOREIGN KEY (controller_id) REFERENCES controllers(id)
-        )
-        ''')
-        
-        # Create ap_types table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ap_types (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ap_type TEXT UNIQUE,
-            count INTEGER,
-            added_on TIMESTAMP
-        )
-        ''')
-        
-        conn.commit()
-        print("Database tables created successfully.")
-    else:
-        print("Database exists, tables already created.")
-    
-    conn.close()
+    # IF NOT EXISTS makes this safe on every start; one transaction covers the whole schema
+    conn.executescript("BEGIN;\n" + DB_SCHEMA + "\nCOMMIT;")
+    print("Database tables ready.")
 
-def store_controller(controller_data):
-    conn = sqlite3.connect('aruba_migration.db')
+def store_controller(controller_data, conn=None):
+    if conn is None:
+        # Standalone call: commit on its own
+        with get_conn() as conn:
+            return store_controller(controller_data, conn)
+    
+    # Cached controller and cluster lists go stale once this row changes
+    invalidate_controller_cache()
     cursor = conn.cursor()
     
     ip_address = controller_data[0]
@@ -849,7 +1101,21 @@ def store_controller(controller_data):
     model = controller_data[3]
     version = controller_data[4]
     
-    # Check if controller already exists
+    if SQLITE_HAS_RETURNING:
+        # Insert the controller, or update it in place if its IP is already known
+        cursor.execute('''
+        INSERT INTO controllers (ip_address, name, nodepath, model, version, added_on)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ip_address) DO UPDATE SET
+            name = excluded.name,
+            nodepath = excluded.nodepath,
+            model = excluded.model,
+            version = excluded.version
+        RETURNING id
+        ''', (ip_address, name, nodepath, model, version, datetime.now()))
+        return cursor.fetchone()[0]
+    
+    # Older SQLite without RETURNING: check if controller already exists
     cursor.execute('SELECT id FROM controllers WHERE ip_address = ?', (ip_address,))
     result = cursor.fetchone()
     
@@ -869,13 +1135,47 @@ def store_controller(controller_data):
         ''', (ip_address, name, nodepath, model, version, datetime.now()))
         controller_id = cursor.lastrowid
     
-    conn.commit()
-    conn.close()
-    
     return controller_id
 
-def store_lc_cluster(controller_id, cluster_info):
-    conn = sqlite3.connect('aruba_migration.db')
+def store_controllers_bulk(controllers, conn=None):
+    """Insert or update all discovered controllers at once, returning their ids keyed by IP address"""
+    if conn is None:
+        # Standalone call: commit on its own
+        with get_conn() as conn:
+            return store_controllers_bulk(controllers, conn)
+    
+    if not SQLITE_HAS_UPSERT:
+        return {controller[0]: store_controller(controller, conn) for controller in controllers}
+    
+    invalidate_controller_cache()
+    cursor = conn.cursor()
+    
+    now = datetime.now()
+    rows = [(ip_address, name, nodepath, model, version, now)
+            for ip_address, name, nodepath, model, version in controllers]
+    
+    # Update rows in place rather than INSERT OR REPLACE, which would give known controllers new ids
+    cursor.executemany('''
+    INSERT INTO controllers (ip_address, name, nodepath, model, version, added_on)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ip_address) DO UPDATE SET
+        name = excluded.name,
+        nodepath = excluded.nodepath,
+        model = excluded.model,
+        version = excluded.version
+    ''', rows)
+    
+    cursor.execute('SELECT ip_address, id FROM controllers')
+    return {ip_address: controller_id for ip_address, controller_id in cursor}
+
+def store_lc_cluster(controller_id, cluster_info, conn=None):
+    if conn is None:
+        # Standalone call: commit on its own
+        with get_conn() as conn:
+            return store_lc_cluster(controller_id, cluster_info, conn)
+    
+    # Cached controller and cluster lists go stale once this row changes
+    invalidate_controller_cache()
     cursor = conn.cursor()
     
     # Delete existing entries for this controller
@@ -889,66 +1189,84 @@ def store_lc_cluster(controller_id, cluster_info):
         controller_id,
         cluster_info['cluster_name'],
         cluster_info['is_leader'],
-        json.dumps(cluster_info['members']),
+        '\n'.join(cluster_info['members']),  # Members are peer IPs, one per line
         datetime.now()
     ))
     
-    conn.commit()
-    conn.close()
     print(f"Stored cluster information: {cluster_info['cluster_name']} for controller ID {controller_id}")
 
-def store_ap_groups(controller_id, ap_groups_data):
-    conn = sqlite3.connect('aruba_migration.db')
+def decode_members(members_text):
+    """Decode a stored members column, reading older JSON-encoded rows as well"""
+    if not members_text:
+        return []
+    if members_text.startswith('['):
+        return json.loads(members_text)
+    return members_text.split('\n')
+
+def store_ap_groups(controller_id, ap_groups_data, conn=None):
+    if conn is None:
+        # Standalone call: commit on its own
+        with get_conn() as conn:
+            return store_ap_groups(controller_id, ap_groups_data, conn)
     cursor = conn.cursor()
     
+    now = datetime.now()
+    rows = [
+        (controller_id, group.get("Name", "Unknown"), group.get("Profile Status"), now)
+        for group in ap_groups_data.get("AP group List", [])
+    ]
+    
     # Delete existing AP groups for this controller
     cursor.execute('DELETE FROM ap_groups WHERE controller_id = ?', (controller_id,))
     
     # Store new AP groups
-    if "AP group List" in ap_groups_data:
-        for group in ap_groups_data["AP group List"]:
-            name = group.get("Name", "Unknown")
-            profile_status = group.get("Profile Status")
-            
-            cursor.execute('''
-            INSERT INTO ap_groups (controller_id, name, profile_status, added_on)
-            VALUES (?, ?, ?, ?)
-            ''', (controller_id, name, profile_status, datetime.now()))
-    
-    conn.commit()
-    conn.close()
+    cursor.executemany('''
+    INSERT INTO ap_groups (controller_id, name, profile_status, added_on)
+    VALUES (?, ?, ?, ?)
+    ''', rows)
 
 def display_database_info():
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_conn()
     cursor = conn.cursor()
     
-    # Get all controllers
-    cursor.execute('SELECT * FROM controllers')
+    # Get all controllers with their LC cluster info in one pass
+    cursor.execute('''
+    SELECT c.*, lc.id AS lc_id, lc.cluster_name, lc.is_leader, lc.members
+    FROM controllers c
+    LEFT JOIN lc_clusters lc ON lc.controller_id = c.id
+    ORDER BY c.id, lc.id
+    ''')
     controllers = cursor.fetchall()
     
     if not controllers:
         print("No controllers found in the database.")
-        conn.close()
         return
     
+    # Get every controller's AP groups at once, grouped by controller
+    ap_groups_by_controller = defaultdict(list)
+    cursor.execute('SELECT controller_id, name, profile_status FROM ap_groups ORDER BY id')
+    for controller_id, name, profile_status in cursor:
+        ap_groups_by_controller[controller_id].append([name, profile_status or 'Regular'])
+    
     print("\n=== Stored Controller Information ===\n")
     
+    seen_ids = set()
     for controller in controllers:
+        # Only the first LC cluster row of each controller is shown
+        if controller['id'] in seen_ids:
+            continue
+        seen_ids.add(controller['id'])
+        
         print(f"Controller: {controller['name']} ({controller['ip_address']})")
         print(f"Model: {controller['model']}")
         print(f"Version: {controller['version']}")
         print(f"Nodepath: {controller['nodepath']}")
         
-        # Get LC cluster info
-        cursor.execute('SELECT * FROM lc_clusters WHERE controller_id = ?', (controller['id'],))
-        lc_cluster = cursor.fetchone()
-        
-        if lc_cluster:
+        if controller['lc_id'] is not None:
             print("\nLC Cluster Information:")
-            print(f"Cluster Name: {lc_cluster['cluster_name']}")
-            print(f"Role: {'Leader' if lc_cluster['is_leader'] else 'Member'}")
-            members = json.loads(lc_cluster['members'])
+            print(f"Cluster Name: {controller['cluster_name']}")
+            print(f"Role: {'Leader' if controller['is_leader'] else 'Member'}")
+            members = decode_members(controller['members'])
             if members:
                 print("Cluster Members:")
                 for member in members:
@@ -956,22 +1274,16 @@ def display_database_info():
         else:
             print("\nLC Cluster Information: Not Available")
         
-        # Get AP groups
-        cursor.execute('SELECT * FROM ap_groups WHERE controller_id = ?', (controller['id'],))
-        ap_groups = cursor.fetchall()
+        ap_group_data = ap_groups_by_controller.get(controller['id'])
         
-        if ap_groups:
+        if ap_group_data:
             print("\nAP Groups:")
-            ap_group_data = []
-            for group in ap_groups:
-                ap_group_data.append([group['name'], group['profile_status'] or 'Regular'])
-            
             headers = ["Name", "Profile Status"]
             print(tabulate(ap_group_data, headers=headers, tablefmt="grid"))
         else:
             print("\nAP Groups: Not Available")
         
-        print("\n" + "="*50 + "\n")
+        print(f"\n{_BANNER_EQ_NARROW}\n")
     
     # Display AP type counts if available
     cursor.execute('SELECT * FROM ap_types')
@@ -989,8 +1301,6 @@ def display_database_info():
         headers = ["AP Type", "Count"]
         print(tabulate(ap_type_data, headers=headers, tablefmt="grid"))
         print(f"\nTotal APs: {total_aps}")
-    
-    conn.close()
 
 def display_md_switches(md_switches):
     global stored_md_switches
@@ -1013,265 +1323,289 @@ def collect_mc_credentials():
     mc_password = getpass("MC Password: ")
     return mc_username, mc_password
 
-def ssh_to_mm(ip, username, password):
-    """Establish SSH connection to Mobility Conductor"""
+def connect_ssh(ip, username, password, log=print):
+    """Open an SSH connection without starting an interactive shell"""
     try:
         # Initialize SSH client
         ssh_client = paramiko.SSHClient()
         ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         
-        print(f"Connecting to {ip} via SSH...")
+        log(f"Connecting to {ip} via SSH...")
         ssh_client.connect(hostname=ip, username=username, password=password, timeout=10)
-        
-        # Get interactive shell
-        shell = ssh_client.invoke_shell()
-        shell.settimeout(10)
-        
-        # Wait for initial prompt
-        output = read_ssh_output(shell)
-        print(output)
-        
-        return ssh_client, shell
+        return ssh_client
     except Exception as e:
-        print(f"SSH connection failed: {str(e)}")
+        log(f"SSH connection failed: {str(e)}")
+        return None
+
+def open_shell(ssh_client, log=print):
+    """Start an interactive shell on a connected SSHClient and wait for its first prompt"""
+    shell = ssh_client.invoke_shell()
+    shell.settimeout(10)
+    
+    # Wait for initial prompt
+    output = read_ssh_output(shell)
+    log(output)
+    return shell
+
+def ssh_to_mm(ip, username, password, log=print):
+    """Establish SSH connection to Mobility Conductor"""
+    ssh_client = connect_ssh(ip, username, password, log=log)
+    if not ssh_client:
+        return None, None
+    try:
+        return ssh_client, open_shell(ssh_client, log=log)
+    except Exception as e:
+        log(f"SSH connection failed: {str(e)}")
+        ssh_client.close()
         return None, None
 
-def read_ssh_output(shell, wait_time=1):
-    """Read output from SSH shell"""
-    time.sleep(wait_time)  # Give time for output to be ready
-    output = ""
-    # Try to read for up to 5 seconds
-    start_time = time.time()
-    while time.time() - start_time < 5:
-        if shell.recv_ready():
-            chunk = shell.recv(4096).decode('utf-8', errors='ignore')
-            output += chunk
-            # If we got a prompt, we can stop reading
-            if "#" in chunk or ">" in chunk:
-                break
-        else:
-            time.sleep(0.1)
-    return output
+def client_is_active(ssh_client):
+    """Check that an SSHClient's transport is still connected"""
+    transport = ssh_client.get_transport()
+    return transport is not None and transport.is_active()
+
+def ping_shell(ssh_client, shell):
+    """Check that a cached SSH session is still connected and back at the CLI prompt"""
+    if not client_is_active(ssh_client) or shell.closed:
+        return False
+    try:
+        # An empty line just brings the prompt back on a live session
+        shell.send("\n")
+        output = read_ssh_output(shell, timeout=1, prompt_re=_CLI_PROMPT_RE)
+        return _CLI_PROMPT_RE.search(output.encode()) is not None
+    except Exception:
+        return False
+
+def get_client(ip, username, password, log=print):
+    """Return a cached SSHClient for exec channels, connecting without a PTY shell if needed"""
+    key = (ip, username)
+    with _ssh_pool_lock:
+        cached = _ssh_pool.get(key)
+    
+    if cached:
+        if client_is_active(cached[0]):
+            return cached[0]
+        close_shell(ip, username)
+    
+    ssh_client = connect_ssh(ip, username, password, log=log)
+    if not ssh_client:
+        return None
+    
+    with _ssh_pool_lock:
+        _ssh_pool[key] = (ssh_client, None)
+    return ssh_client
+
+def get_shell(ip, username, password, log=print):
+    """Return a cached SSH shell for a controller or conductor, reconnecting if it has gone stale"""
+    key = (ip, username)
+    with _ssh_pool_lock:
+        cached = _ssh_pool.get(key)
+    
+    if cached:
+        ssh_client, shell = cached
+        if shell is None and client_is_active(ssh_client):
+            # Connected by get_client(); start the shell on the same transport
+            try:
+                shell = open_shell(ssh_client, log=log)
+                with _ssh_pool_lock:
+                    _ssh_pool[key] = (ssh_client, shell)
+                return shell
+            except Exception as e:
+                log(f"SSH shell failed: {str(e)}")
+        elif shell is not None and ping_shell(ssh_client, shell):
+            return shell
+        close_shell(ip, username)
+    
+    ssh_client, shell = ssh_to_mm(ip, username, password, log=log)
+    if not ssh_client or not shell:
+        return None
+    
+    with _ssh_pool_lock:
+        _ssh_pool[key] = (ssh_client, shell)
+    return shell
+
+def pooled_client(ip, username):
+    """Return the SSHClient behind a shell handed out by get_shell() or get_client()"""
+    with _ssh_pool_lock:
+        return _ssh_pool[(ip, username)][0]
+
+def close_shell(ip, username):
+    """Close and forget the cached SSH session for a controller"""
+    with _ssh_pool_lock:
+        cached = _ssh_pool.pop((ip, username), None)
+    if cached:
+        try:
+            cached[0].close()
+        except Exception:
+            pass
 
-def send_ssh_command(shell, command, wait_time=1):
+def close_all_shells():
+    """Close every cached SSH session"""
+    for ip, username in list(_ssh_pool):
+        close_shell(ip, username)
+
+atexit.register(close_all_shells)
+
+def read_ssh_output(shell, timeout=5, prompt_re=_SSH_PROMPT_RE):
+    """Read output from SSH shell until prompt_re matches the end of it or the timeout passes"""
+    # Reuse one receive buffer per channel instead of allocating a new one for every command
+    buf = getattr(shell, '_recv_buf', None)
+    if buf is None:
+        buf = shell._recv_buf = bytearray()
+    else:
+        del buf[:]
+    deadline = time.time() + timeout
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        shell.settimeout(remaining)
+        try:
+            chunk = shell.recv(65536)  # Blocks until data arrives
+        except socket.timeout:
+            break
+        if not chunk:  # Channel closed
+            break
+        buf += chunk
+        # Stop as soon as the device is waiting for input
+        if prompt_re.search(buf):
+            break
+    return buf.decode('utf-8', errors='ignore')
+
+def send_ssh_command(shell, command, wait_time=1, log=print, prompt_re=_SSH_PROMPT_RE):
     """Send command to SSH shell and return output"""
-    print(f"Sending command: {command}")
+    log(f"Sending command: {command}")
     shell.send(command + "\n")
-    time.sleep(wait_time)  # Give time for command to execute
-    output = read_ssh_output(shell)
-    print(output)
+    # wait_time only extends the ceiling; the read returns as soon as a prompt is back
+    output = read_ssh_output(shell, timeout=5 + wait_time, prompt_re=prompt_re)
+    log(output)
+    return output
+
+def run_ssh_exec(ssh_client, command, stdin_lines=("y\n",), timeout=10):
+    """Run one command on its own exec channel, pre-answering any [y/n] prompt, and return its output"""
+    stdin, stdout, _ = ssh_client.exec_command(command, timeout=timeout)
+    try:
+        # Extra input is simply discarded when the command does not ask for confirmation
+        stdin.writelines(stdin_lines)
+        stdin.flush()
+        return stdout.read().decode('utf-8', errors='ignore')  # socket.timeout after timeout seconds
+    finally:
+        stdout.channel.close()
+
+def send_ssh_script(shell, lines, final_wait=5, log=print):
+    """Send several commands in one write and read until every one of them is back at the prompt"""
+    log(f"Sending commands: {'; '.join(lines)}")
+    shell.send("\n".join(lines) + "\n")
+    
+    output = ""
+    deadline = time.time() + 5 + final_wait
+    while time.time() < deadline:
+        chunk = read_ssh_output(shell, timeout=deadline - time.time())
+        if not chunk:
+            break
+        output += chunk
+        # Type-ahead is echoed before earlier commands finish, so the last echo is no sign of
+        # completion; each command ends in exactly one prompt, so wait for all of them
+        if len(_PROMPT_MARK_RE.findall(output)) >= len(lines) and _SSH_PROMPT_RE.search(chunk.encode()):
+            break
+    log(output)
     return output
 
 def get_clusters_for_nodepath(nodepath):
     """Get all cluster names for a specific nodepath"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get controller IDs for this nodepath
-    cursor.execute('''
-    SELECT id FROM controllers WHERE nodepath = ?
-    ''', (nodepath,))
-    
-    controller_ids = [row['id'] for row in cursor.fetchall()]
-    
-    if not controller_ids:
-        conn.close()
-        return []
+    cursor = tuple_cursor()
     
-    # Get cluster names for these controllers (excluding 'Unknown')
-    placeholders = ','.join(['?' for _ in controller_ids])
-    cursor.execute(f'''
-    SELECT DISTINCT cluster_name FROM lc_clusters 
-    WHERE controller_id IN ({placeholders})
-    AND cluster_name != 'Unknown' AND cluster_name IS NOT NULL
-    ''', controller_ids)
+    # Get cluster names for controllers on this nodepath (excluding 'Unknown')
+    cursor.execute(SQL_CLUSTERS_FOR_NODEPATH, (nodepath,))
     
-    cluster_names = [row['cluster_name'] for row in cursor.fetchall()]
-    conn.close()
-    return cluster_names
+    return [cluster_name for (cluster_name,) in cursor]
 
 def get_all_cluster_names_including_unknown():
     """Get all cluster names including 'Unknown' ones (for counting purposes)"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = tuple_cursor()
     
-    cursor.execute('''
-    SELECT DISTINCT cluster_name FROM lc_clusters
-    ''')
+    cursor.execute(SQL_ALL_CLUSTER_NAMES_INCLUDING_UNKNOWN)
     
-    cluster_names = [row['cluster_name'] for row in cursor.fetchall()]
-    conn.close()
-    return cluster_names
+    return [cluster_name for (cluster_name,) in cursor]
 
 def get_all_clusters_with_nodepaths():
     """Get all unique clusters with their corresponding nodepaths, excluding 'Unknown' clusters"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get cluster info with controller details, excluding 'Unknown' clusters
-    cursor.execute('''
-    SELECT DISTINCT lc.cluster_name, c.nodepath
-    FROM lc_clusters lc
-    JOIN controllers c ON lc.controller_id = c.id
-    WHERE lc.cluster_name != 'Unknown' AND lc.cluster_name IS NOT NULL
-    ''')
+    global _clusters_with_nodepaths_cache
     
-    clusters_info = [(row['cluster_name'], row['nodepath']) for row in cursor.fetchall()]
-    conn.close()
-    return clusters_info
+    if _clusters_with_nodepaths_cache is None:
+        cursor = tuple_cursor()
+        
+        # Get cluster info with controller details, excluding 'Unknown' clusters
+        cursor.execute(SQL_CLUSTERS_WITH_NODEPATHS)
+        
+        # Rows are already (cluster_name, nodepath) tuples
+        _clusters_with_nodepaths_cache = cursor.fetchall()
+    return _clusters_with_nodepaths_cache
 
 def get_all_cluster_names():
     """Get all unique cluster names from the database, excluding 'Unknown' clusters"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = tuple_cursor()
     
-    cursor.execute('''
-    SELECT DISTINCT cluster_name FROM lc_clusters
-    WHERE cluster_name != 'Unknown' AND cluster_name IS NOT NULL
-    ''')
+    cursor.execute(SQL_CLUSTER_NAMES)
     
-    cluster_names = [row['cluster_name'] for row in cursor.fetchall()]
-    conn.close()
-    return cluster_names
+    return [cluster_name for (cluster_name,) in cursor]
 
 def get_nodepath_for_cluster(cluster_name):
     """Get the nodepath for a specific cluster"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get controller IDs for this cluster
-    cursor.execute('''
-    SELECT controller_id FROM lc_clusters WHERE cluster_name = ?
-    ''', (cluster_name,))
-    
-    controller_ids = [row['controller_id'] for row in cursor.fetchall()]
-    
-    if not controller_ids:
-        conn.close()
-        return None
+    cursor = tuple_cursor()
     
     # Get nodepath from the first controller (they should all be the same for a cluster)
-    cursor.execute('''
-    SELECT nodepath FROM controllers WHERE id = ?
-    ''', (controller_ids[0],))
+    cursor.execute(SQL_NODEPATH_FOR_CLUSTER, (cluster_name,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
-        return result['nodepath']
+        return result[0]
     return None
 
 def get_cluster_name_for_controller(controller_name):
     """Get the cluster name for a specific controller by name"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get controller ID by name
-    cursor.execute('''
-    SELECT id FROM controllers WHERE name = ?
-    ''', (controller_name,))
-    
-    result = cursor.fetchone()
-    if not result:
-        conn.close()
-        return None
+    cursor = tuple_cursor()
     
-    controller_id = result['id']
-    
-    # Get cluster name for this controller
-    cursor.execute('''
-    SELECT cluster_name FROM lc_clusters WHERE controller_id = ?
-    ''', (controller_id,))
+    # Get cluster name for the controller with this name
+    cursor.execute(SQL_CLUSTER_FOR_CONTROLLER, (controller_name,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
-        return result['cluster_name']
+        return result[0]
     return None
 
 def get_lc_cluster_for_nodepath(nodepath):
     """Get the appropriate LC cluster name for a specific nodepath from the database"""
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = tuple_cursor()
     
-    # Get controllers with this nodepath
-    cursor.execute('''
-    SELECT id FROM controllers WHERE nodepath = ?
-    ''', (nodepath,))
-    
-    controller_ids = [row['id'] for row in cursor.fetchall()]
-    
-    if not controller_ids:
-        conn.close()
-        return None
-    
-    # Find LC clusters for these controllers
-    placeholders = ','.join(['?' for _ in controller_ids])
-    cursor.execute(f'''
-    SELECT DISTINCT cluster_name FROM lc_clusters 
-    WHERE controller_id IN ({placeholders})
-    ''', controller_ids)
+    # Find LC clusters for controllers with this nodepath
+    cursor.execute(SQL_LC_CLUSTER_FOR_NODEPATH, (nodepath,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
-        return result['cluster_name']
+        return result[0]
     return None
 
 def get_available_clusters():
     """Get a list of available clusters from the database, excluding 'Unknown' clusters"""
-    clusters = []
-    
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT DISTINCT cluster_name FROM lc_clusters
-    WHERE cluster_name != 'Unknown' AND cluster_name IS NOT NULL
-    ''')
+    cursor = tuple_cursor()
     
-    for row in cursor.fetchall():
-        clusters.append(row['cluster_name'])
+    cursor.execute(SQL_CLUSTER_NAMES)
     
-    conn.close()
-    return clusters
+    return [cluster_name for (cluster_name,) in cursor]
 
 def get_controllers_by_cluster(cluster_name):
     """Get controller information for a specific cluster"""
     controllers = []
     
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_conn()
     cursor = conn.cursor()
     
-    # Get cluster IDs matching the cluster name
-    cursor.execute('''
-    SELECT controller_id FROM lc_clusters WHERE cluster_name = ?
-    ''', (cluster_name,))
-    
-    controller_ids = [row['controller_id'] for row in cursor.fetchall()]
-    
-    if not controller_ids:
-        print(f"No controllers found for cluster: {cluster_name}")
-        conn.close()
-        return controllers
-    
-    # Get controller information
-    placeholders = ','.join(['?' for _ in controller_ids])
-    cursor.execute(f'''
-    SELECT * FROM controllers WHERE id IN ({placeholders})
-    ''', controller_ids)
+    # Get controller information for controllers in this cluster
+    cursor.execute(SQL_CONTROLLERS_BY_CLUSTER, (cluster_name,))
     
     for row in cursor.fetchall():
         controllers.append({
@@ -1281,15 +1615,21 @@ def get_controllers_by_cluster(cluster_name):
             'nodepath': row['nodepath']
         })
     
-    conn.close()
+    if not controllers:
+        print(f"No controllers found for cluster: {cluster_name}")
+    
     return controllers
 
 def get_all_controllers():
-    """Get all controller information from the database"""
+    """Get all controller information from the database (cached until the next store or clear)"""
+    global _all_controllers_cache
+    
+    if _all_controllers_cache is not None:
+        return _all_controllers_cache
+    
     controllers = []
     
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_conn()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM controllers')
@@ -1302,26 +1642,16 @@ def get_all_controllers():
             'nodepath': row['nodepath']
         })
     
-    conn.close()
+    _all_controllers_cache = controllers
     return controllers
 
-def get_ap_groups_for_controller(controller_id):
-    """Get a list of AP groups for a specific controller"""
-    ap_groups = []
+def get_ap_groups_for_cluster(cluster_name):
+    """Get the sorted, de-duplicated AP group names across all controllers in a cluster"""
+    cursor = tuple_cursor()
     
-    conn = sqlite3.connect('aruba_migration.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor.execute(SQL_AP_GROUPS_FOR_CLUSTER, (cluster_name,))
     
-    cursor.execute('''
-    SELECT name FROM ap_groups WHERE controller_id = ?
-    ''', (controller_id,))
-    
-    for row in cursor.fetchall():
-        ap_groups.append(row['name'])
-    
-    conn.close()
-    return ap_groups
+    return [name for (name,) in cursor]
 
 def select_cluster():
     """Allow user to select a cluster to work with"""
@@ -1365,6 +1695,41 @@ def select_cluster():
         print("Invalid input. Please enter a number.")
         return False
 
+def _run_ap_convert_init(controller, command, mc_username, mc_password):
+    """Run the AP convert init command on one controller over SSH, returning (ok, output lines)"""
+    lines = []
+    log = lines.append
+    log(f"\nConnecting to {controller['name']} ({controller['ip_address']})...")
+    
+    # Reuse the controller's SSH session from earlier actions when it is still alive
+    shell = get_shell(controller['ip_address'], mc_username, mc_password, log=log)
+    
+    if not shell:
+        log(f"Failed to establish SSH connection to {controller['name']}. Skipping.")
+        return False, lines
+    
+    try:
+        log(f"Executing AP convert command on {controller['name']}...")
+        
+        # Execute the convert command
+        output = send_ssh_command(shell, command, log=log)
+        
+        # Check if we got the warning prompt
+        if "WARNING:" in output and _CONFIRM_RE.search(output):
+            log(f"Received confirmation prompt on {controller['name']}. Sending 'y'...")
+            output = send_ssh_command(shell, "y", log=log)
+            log(f"AP convert command activated on {controller['name']}.")
+            return True, lines
+        
+        log(f"Did not receive expected confirmation prompt on {controller['name']}. The command may have failed.")
+        
+    except Exception as e:
+        log(f"Error during SSH session with {controller['name']}: {str(e)}")
+        # Drop the session so the next action reconnects cleanly
+        close_shell(controller['ip_address'], mc_username)
+    
+    return False, lines
+
 def execute_ap_convert_init(mc_username, mc_password):
     """Execute the initial AP convert command on all controllers in the selected cluster"""
     global selected_cluster
@@ -1381,44 +1746,54 @@ def execute_ap_convert_init(mc_username, mc_password):
     
     command = "ap convert active specific-aps activate max-downloads 20 no-pre-validation"
     
-    success_count = 0
+    # Run on every controller in parallel; each worker reports success or failure
+    with ThreadPoolExecutor(max_workers=min(16, len(controllers))) as executor:
+        results = executor.map(
+            lambda controller: _run_ap_convert_init(controller, command, mc_username, mc_password),
+            controllers
+        )
+        
+        # Print each controller's output as one block, in controller order
+        success_count = 0
+        for ok, lines in results:
+            print("\n".join(lines))
+            success_count += ok
     
-    for controller in controllers:
-        print(f"\nConnecting to {controller['name']} ({controller['ip_address']})...")
+    print(f"\nAP convert command executed successfully on {success_count} out of {len(controllers)} controllers.")
+    return success_count > 0
+
+def _run_ap_group_add(controller, command, mc_username, mc_password):
+    """Run an 'ap convert add ap-group' command on one controller over SSH, returning (ok, output lines)"""
+    lines = []
+    log = lines.append
+    log(f"\nConnecting to {controller['name']} ({controller['ip_address']})...")
+    
+    # Reuse the controller's SSH session from earlier actions when it is still alive
+    shell = get_shell(controller['ip_address'], mc_username, mc_password, log=log)
+    
+    if not shell:
+        log(f"Failed to establish SSH connection to {controller['name']}. Skipping.")
+        return False, lines
+    
+    try:
+        log(f"Executing command on {controller['name']}: {command}")
         
-        # Connect to controller via SSH
-        ssh_client, shell = ssh_to_mm(controller['ip_address'], mc_username, mc_password)
+        # Execute the command
+        output = send_ssh_command(shell, command, log=log)
         
-        if not ssh_client or not shell:
-            print(f"Failed to establish SSH connection to {controller['name']}. Skipping.")
-            continue
+        if _CLI_ERROR_RE.search(output):
+            log(f"Command failed on {controller['name']}: {output}")
+            return False, lines
         
-        try:
-            print(f"Executing AP convert command on {controller['name']}...")
-            
-            # Execute the convert command
-            output = send_ssh_command(shell, command)
-            
-            # Check if we got the warning prompt
-            if "WARNING:" in output and "Do you want to proceed with the operation? [y/n]:" in output:
-                print("Received confirmation prompt. Sending 'y'...")
-                output = send_ssh_command(shell, "y")
-                print("AP convert command activated.")
-                success_count += 1
-            else:
-                print("Did not receive expected confirmation prompt. The command may have failed.")
-            
-        except Exception as e:
-            print(f"Error during SSH session with {controller['name']}: {str(e)}")
+        log(f"AP group successfully added on {controller['name']}.")
+        return True, lines
         
-        finally:
-            # Close SSH connection
-            if ssh_client:
-                ssh_client.close()
-                print(f"SSH connection to {controller['name']} closed.")
+    except Exception as e:
+        log(f"Error during SSH session with {controller['name']}: {str(e)}")
+        # Drop the session so the next action reconnects cleanly
+        close_shell(controller['ip_address'], mc_username)
     
-    print(f"\nAP convert command executed successfully on {success_count} out of {len(controllers)} controllers.")
-    return success_count > 0
+    return False, lines
 
 def select_and_add_ap_group():
     """Select an AP group and add it to the AP convert command on all controllers in the selected cluster"""
@@ -1435,18 +1810,14 @@ def select_and_add_ap_group():
         return False
     
     # Get all AP groups across all controllers in the cluster
-    all_ap_groups = set()
-    
-    for controller in controllers:
-        ap_groups = get_ap_groups_for_controller(controller['id'])
-        all_ap_groups.update(ap_groups)
+    all_ap_groups = get_ap_groups_for_cluster(selected_cluster)
     
     if not all_ap_groups:
         print("No AP groups found for the selected cluster.")
         return False
     
     # Filter out already selected AP groups
-    available_groups = [group for group in sorted(list(all_ap_groups)) if group not in selected_ap_groups]
+    available_groups = [group for group in all_ap_groups if group not in selected_ap_groups]
     
     if not available_groups:
         print("All available AP groups have already been selected for conversion.")
@@ -1472,9 +1843,9 @@ def select_and_add_ap_group():
             selected_group = available_groups[selection - 1]
             
             # ADD CONFIRMATION STEP HERE
-            print(f"\n{'='*60}")
+            print(f"\n{_BANNER_EQ}")
             print("CONFIRMATION")
-            print(f"{'='*60}")
+            print(_BANNER_EQ)
             print(f"Selected AP Group: {selected_group}")
             print(f"Selected Cluster: {selected_cluster}")
             print(f"Command to execute: ap convert add ap-group {selected_group}")
@@ -1484,11 +1855,9 @@ def select_and_add_ap_group():
             
             if selected_ap_groups:
                 print(f"\nPreviously selected AP groups: {', '.join(selected_ap_groups)}")
-            print(f"{'='*60}")
+            print(_BANNER_EQ)
             
-            confirm = input(f"Proceed with adding AP group '{selected_group}' to all controllers? (y/n): ")
-            
-            if confirm.lower() != 'y':
+            if ask(f"Proceed with adding AP group '{selected_group}' to all controllers? (y/n): ") != 'y':
                 print("Operation cancelled.")
                 return False
             
@@ -1496,38 +1865,18 @@ def select_and_add_ap_group():
             command = f"ap convert add ap-group {selected_group}"
             print(f"\nAdding AP group '{selected_group}' to AP convert command on all controllers in cluster {selected_cluster}...")
             
-            success_count = 0
-            
-            for controller in controllers:
-                print(f"\nConnecting to {controller['name']} ({controller['ip_address']})...")
-                
-                # Connect to controller via SSH
-                ssh_client, shell = ssh_to_mm(controller['ip_address'], mc_username, mc_password)
+            # Run on every controller in parallel; each worker reports success or failure
+            with ThreadPoolExecutor(max_workers=min(16, len(controllers))) as executor:
+                results = executor.map(
+                    lambda controller: _run_ap_group_add(controller, command, mc_username, mc_password),
+                    controllers
+                )
                 
-                if not ssh_client or not shell:
-                    print(f"Failed to establish SSH connection to {controller['name']}. Skipping.")
-                    continue
-                
-                try:
-                    print(f"Executing command on {controller['name']}: {command}")
-                    
-                    # Execute the command
-                    output = send_ssh_command(shell, command)
-                    
-                    if "Error" in output or "Invalid" in output:
-                        print(f"Command failed on {controller['name']}: {output}")
-                    else:
-                        print(f"AP group successfully added on {controller['name']}.")
-                        success_count += 1
-                    
-                except Exception as e:
-                    print(f"Error during SSH session with {controller['name']}: {str(e)}")
-                
-                finally:
-                    # Close SSH connection
-                    if ssh_client:
-                        ssh_client.close()
-                        print(f"SSH connection to {controller['name']} closed.")
+                # Print each controller's output as one block, in controller order
+                success_count = 0
+                for ok, lines in results:
+                    print("\n".join(lines))
+                    success_count += ok
             
             # Add to selected AP groups list if successful on at least one controller
             if success_count > 0:
@@ -1545,6 +1894,16 @@ def select_and_add_ap_group():
         print("Invalid input. Please enter a number.")
         return False
 
+def get_md_nodepaths():
+    """Return the unique nodepaths of the discovered MD controllers, in discovery order"""
+    global _nodepath_cache
+    
+    # Recompute only when discovery has replaced stored_md_switches
+    if _nodepath_cache is None or _nodepath_cache[0] is not stored_md_switches:
+        nodepaths = list(dict.fromkeys(controller[2] for controller in stored_md_switches))  # nodepath is at index 2
+        _nodepath_cache = (stored_md_switches, nodepaths)
+    return _nodepath_cache[1]
+
 def prep_migration_ssh(ip, username, password):
     """Prepare for migration using SSH instead of API"""
     global stored_md_switches, prep_migration_target
@@ -1553,22 +1912,18 @@ def prep_migration_ssh(ip, username, password):
         print("No MD controllers found. Please run the automated discovery first (option 1).")
         return
     
-    # Get unique nodepaths from stored controllers
-    nodepaths = set()
-    for controller in stored_md_switches:
-        nodepaths.add(controller[2])  # nodepath is at index 2
+    # Get unique nodepaths from stored controllers, in discovery order
+    nodepath_list = get_md_nodepaths()
     
     selected_nodepath = None
-    if len(nodepaths) == 1:
-        selected_nodepath = list(nodepaths)[0]
+    if len(nodepath_list) == 1:
+        selected_nodepath = nodepath_list[0]
         print(f"Only one nodepath found: {selected_nodepath}")
-        confirm = input("Use this nodepath? (y/n): ")
-        if confirm.lower() != 'y':
+        if ask("Use this nodepath? (y/n): ") != 'y':
             print("Operation cancelled.")
             return
     else:
         print("Multiple nodepaths found:")
-        nodepath_list = list(nodepaths)
         for i, path in enumerate(nodepath_list, 1):
             print(f"{i}. {path}")
         selection = input("Select nodepath number: ")
@@ -1590,16 +1945,14 @@ def prep_migration_ssh(ip, username, password):
     
     if not available_clusters:
         print(f"No LC cluster information found for nodepath {selected_nodepath}.")
-        print("Would you like to manually enter the LC cluster name? (y/n)")
-        if input().lower() == 'y':
+        if ask("Would you like to manually enter the LC cluster name? (y/n): ") == 'y':
             cluster_name = input("Enter LC cluster name: ")
         else:
             return
     elif len(available_clusters) == 1:
         cluster_name = available_clusters[0]
         print(f"Only one cluster found for this nodepath: {cluster_name}")
-        confirm = input("Use this cluster? (y/n): ")
-        if confirm.lower() != 'y':
+        if ask("Use this cluster? (y/n): ") != 'y':
             print("Operation cancelled.")
             return
     else:
@@ -1622,47 +1975,58 @@ def prep_migration_ssh(ip, username, password):
     print(f"Target: Nodepath '{selected_nodepath}' -> Cluster '{cluster_name}'")
     
     # Final confirmation
-    confirm = input(f"\nProceed with disabling LC cluster settings for:\n  Nodepath: {selected_nodepath}\n  Cluster: {cluster_name}\n(y/n): ")
-    if confirm.lower() != 'y':
+    if ask(f"\nProceed with disabling LC cluster settings for:\n  Nodepath: {selected_nodepath}\n  Cluster: {cluster_name}\n(y/n): ") != 'y':
         print("Operation cancelled.")
         return
     
-    # Connect to MM via SSH
-    ssh_client, shell = ssh_to_mm(ip, username, password)
-    if not ssh_client or not shell:
+    # Connect to MM via SSH, reusing an earlier session when it is still alive
+    shell = get_shell(ip, username, password)
+    if not shell:
         print("Failed to establish SSH connection. Aborting.")
         return
     
     try:
         print(f"\n=== Starting Prep Migration Process via SSH ===")
         print(f"Target: {selected_nodepath} -> {cluster_name}")
-        print("="*60)
+        print(_BANNER_EQ)
         
         # Change to the nodepath
         print(f"[STEP 1/6] Changing to nodepath: {selected_nodepath}")
         output = send_ssh_command(shell, f"change-config-node {selected_nodepath}")
         
+        # Whether each cluster profile could be entered on this nodepath, so a rejected name is not sent again
+        tried = {}
+        
+        def enter_cluster_profile(name):
+            """Try to enter an LC cluster profile, returning (entered, output)"""
+            if tried.get(name) is False:
+                print(f"LC cluster profile '{name}' was already rejected on this nodepath. Not retrying.")
+                return False, ""
+            output = send_ssh_command(shell, f"lc-cluster group-profile {name}")
+            entered = _CLUSTER_CTX_RE.search(output) is not None
+            # Outside config mode the command fails whatever the name, so only record a rejection inside it
+            if entered or cfg_depth > 0:
+                tried[name] = entered
+            return entered, output
+        
         # Enter configuration mode
         print("[STEP 2/6] Entering configuration mode...")
         output = send_ssh_command(shell, "configure terminal")
         
+        # Config levels actually entered (configure terminal, then the cluster profile); only these get an 'exit'
+        cfg_depth = 0 if _CLI_ERROR_RE.search(output) else 1
+        
         # First try to enter existing LC cluster profile
         print(f"[STEP 3/6] Entering LC cluster profile: {cluster_name}")
-        output = send_ssh_command(shell, f"lc-cluster group-profile {cluster_name}")
+        in_cluster_context, output = enter_cluster_profile(cluster_name)
         
         # Check if we're in the cluster profile context by looking for various possible prompts
-        in_cluster_context = False
-        if any(x in output for x in [
-            "Classic Controller Cluster Profile", 
-            "(lc-cluster-profile)", 
-            "(LC-CLUSTER-PROFILE)",
-            "lc-cluster-profile"
-        ]):
-            in_cluster_context = True
+        if in_cluster_context:
+            cfg_depth += 1
             print("✓ Successfully entered LC cluster profile context.")
         
         # If we hit an error, try alternative approaches
-        if "Error:" in output or "Invalid" in output or not in_cluster_context:
+        if _CLI_ERROR_RE.search(output) or not in_cluster_context:
             print("Would you like to:")
             print("1. List available LC cluster profiles for this nodepath")
             print("2. Try a different cluster name")
@@ -1671,7 +2035,10 @@ def prep_migration_ssh(ip, username, password):
             
             if choice == "1":
                 # List available profiles for this nodepath
-                send_ssh_command(shell, "exit")  # Exit config mode
+                # Exit config mode, if it was entered at all
+                while cfg_depth > 0:
+                    send_ssh_command(shell, "exit")
+                    cfg_depth -= 1
                 print(f"Showing LC cluster information for nodepath {selected_nodepath}:")
                 output = send_ssh_command(shell, "show lc-cluster group-membership")
                 
@@ -1681,21 +2048,17 @@ def prep_migration_ssh(ip, username, password):
                     found_cluster_name = match.group(1)
                     print(f"Found cluster name: {found_cluster_name}")
                     
-                    use_found = input(f"Use found cluster '{found_cluster_name}'? (y/n): ")
-                    if use_found.lower() == 'y':
+                    if ask(f"Use found cluster '{found_cluster_name}'? (y/n): ") == 'y':
                         cluster_name = found_cluster_name
                         
                         # Re-enter config mode
-                        send_ssh_command(shell, "configure terminal")
-                        output = send_ssh_command(shell, f"lc-cluster group-profile {cluster_name}")
+                        output = send_ssh_command(shell, "configure terminal")
+                        if not _CLI_ERROR_RE.search(output):
+                            cfg_depth += 1
+                        in_cluster_context, output = enter_cluster_profile(cluster_name)
                         
-                        if any(x in output for x in [
-                            "Classic Controller Cluster Profile", 
-                            "(lc-cluster-profile)", 
-                            "(LC-CLUSTER-PROFILE)",
-                            "lc-cluster-profile"
-                        ]):
-                            in_cluster_context = True
+                        if in_cluster_context:
+                            cfg_depth += 1
                             print("✓ Successfully entered LC cluster profile context.")
                     else:
                         raise Exception("User chose not to use found cluster name")
@@ -1705,15 +2068,10 @@ def prep_migration_ssh(ip, username, password):
             
             elif choice == "2":
                 cluster_name = input("Enter the correct LC cluster name: ")
-                output = send_ssh_command(shell, f"lc-cluster group-profile {cluster_name}")
+                in_cluster_context, output = enter_cluster_profile(cluster_name)
                 
-                if any(x in output for x in [
-                    "Classic Controller Cluster Profile", 
-                    "(lc-cluster-profile)", 
-                    "(LC-CLUSTER-PROFILE)",
-                    "lc-cluster-profile"
-                ]):
-                    in_cluster_context = True
+                if in_cluster_context:
+                    cfg_depth += 1
                     print("✓ Successfully entered LC cluster profile context.")
             
             else:
@@ -1722,26 +2080,22 @@ def prep_migration_ssh(ip, username, password):
         if not in_cluster_context:
             raise Exception("Could not enter LC cluster configuration context after multiple attempts")
         
-        # Now we should be in the cluster profile context, proceed with commands
-        # Disable active AP load balancing
+        # Now we should be in the cluster profile context; send the rest in one batch
         print("[STEP 4/6] Disabling active AP load balancing...")
-        send_ssh_command(shell, "no active-ap-lb")
-        print("✓ Active AP load balancing disabled.")
-        
-        # Disable redundancy
         print("[STEP 5/6] Disabling redundancy...")
-        send_ssh_command(shell, "no redundancy")
-        print("✓ Redundancy disabled.")
-        
-        # Exit LC cluster configuration
-        send_ssh_command(shell, "exit")
-        
-        # Exit configuration mode
-        send_ssh_command(shell, "exit")
-        
-        # Save configuration
         print("[STEP 6/6] Saving configuration...")
-        send_ssh_command(shell, "write memory", wait_time=5)  # Longer wait for write memory
+        output = send_ssh_script(shell, [
+            "no active-ap-lb",
+            "no redundancy",
+            *["exit"] * cfg_depth,  # Exit LC cluster configuration and configuration mode
+            "write memory",
+        ], final_wait=8)  # Longer wait for write memory
+        
+        if _CLI_ERROR_RE.search(output):
+            print(f"⚠️  Prep command output: {output}")
+        else:
+            print("✓ Active AP load balancing disabled.")
+            print("✓ Redundancy disabled.")
         print("✓ Configuration saved.")
         
         # STORE THE PREP MIGRATION TARGET FOR LATER USE IN OPTION 7
@@ -1751,9 +2105,9 @@ def prep_migration_ssh(ip, username, password):
         }
         print(f"\n📝 Prep migration target saved: {selected_nodepath} -> {cluster_name}")
         
-        print(f"\n{'='*60}")
+        print(f"\n{_BANNER_EQ}")
         print("=== Prep Migration Process Complete ===")
-        print(f"{'='*60}")
+        print(_BANNER_EQ)
         print(f"Target processed: {selected_nodepath} -> {cluster_name}")
         print("✓ AP load balancing disabled")
         print("✓ Redundancy disabled") 
@@ -1763,12 +2117,187 @@ def prep_migration_ssh(ip, username, password):
     
     except Exception as e:
         print(f"✗ Error during SSH session: {str(e)}")
+        # The session may be left inside config mode, so don't reuse it
+        close_shell(ip, username)
+
+def _cleanup_via_shell(shell, name, log):
+    """Run the AP convert cleanup commands through an interactive shell, answering confirmation prompts
+
+    Returns True when neither command was rejected by the controller.
+    """
+    ok = True
+    # Step 1: Execute ap convert clear-all command
+    log(f"[STEP 1/2] Executing 'ap convert clear-all' on {name}...")
+    output = send_ssh_command(shell, "ap convert clear-all", wait_time=2, log=log)
+    
+    # Check for confirmation prompt
+    if _CONFIRM_RE.search(output):
+        log("Received confirmation prompt for clear-all. Sending 'y'...")
+        output = send_ssh_command(shell, "y", wait_time=2, log=log)
+        log("Clear-all command executed.")
+    else:
+        log("Clear-all command completed (no confirmation required).")
+    ok = ok and not _CLI_ERROR_RE.search(output)
+    
+    # Step 2: Execute ap convert cancel command
+    log(f"[STEP 2/2] Executing 'ap convert cancel' on {name}...")
+    output = send_ssh_command(shell, "ap convert cancel", wait_time=2, log=log)
+    
+    # Check for confirmation prompt
+    if _CONFIRM_RE.search(output):
+        log("Received confirmation prompt for cancel. Sending 'y'...")
+        output = send_ssh_command(shell, "y", wait_time=2, log=log)
+        log("Cancel command executed.")
+    else:
+        log("Cancel command completed (no confirmation required).")
+    return ok and not _CLI_ERROR_RE.search(output)
+
+def _cleanup_one_mc(controller, mc_username, mc_password):
+    """Run 'ap convert clear-all' and 'ap convert cancel' on one controller, returning (name, ok, output lines)"""
+    lines = []
+    log = lines.append
+    name = controller['name']
+    
+    log(f"\n[MC] Processing: {name} ({controller['ip_address']})")
+    log(_BANNER_DASH)
+    
+    # Connect to controller via SSH, reusing an earlier session when it is still alive.
+    # Exec channels need no PTY shell; one is only opened if the controller refuses them.
+    ssh_client = get_client(controller['ip_address'], mc_username, mc_password, log=log)
+    
+    if not ssh_client:
+        log(f"Failed to establish SSH connection to {name}. Skipping.")
+        return name, False, lines
+    
+    try:
+        ok = True
+        try:
+            # One exec channel per command: no prompt scanning, and 'y' is pre-fed for any confirmation
+            for step, command in enumerate(("ap convert clear-all", "ap convert cancel"), 1):
+                log(f"[STEP {step}/2] Executing '{command}' on {name}...")
+                output = run_ssh_exec(ssh_client, command)
+                log(output)
+                if _CLI_ERROR_RE.search(output):
+                    log(f"⚠️  '{command}' was rejected on {name}")
+                    ok = False
+        except (paramiko.SSHException, socket.timeout) as e:
+            # Some controllers refuse exec requests or never close them; both commands are safe to repeat in the shell
+            log(f"Exec channel unavailable ({str(e) or 'timed out'}), using the interactive shell...")
+            shell = get_shell(controller['ip_address'], mc_username, mc_password, log=log)
+            if not shell:
+                log(f"Failed to open an SSH shell on {name}. Skipping.")
+                return name, False, lines
+            ok = _cleanup_via_shell(shell, name, log)
+        
+        if not ok:
+            log(f"✗ AP Convert cleanup failed on {name}")
+            return name, False, lines
+        
+        log(f"✓ AP Convert cleanup completed successfully on {name}")
+        return name, True, lines
+        
+    except Exception as e:
+        log(f"✗ Error during SSH session with {name}: {str(e)}")
+        close_shell(controller['ip_address'], mc_username)
+        return name, False, lines
+
+def _restore_cluster(shell, cluster_name, nodepath, log=print, save_lock=None):
+    """Re-enable redundancy and active AP load balancing for one LC cluster on the MM, returning True once saved
+
+    With save_lock, 'write memory' is sent on its own while holding the lock, so parallel sessions save one at a time.
+    """
+    lc_restoration_success = False
+    
+    log(f"\n[STEP 3/5] Restoring LC cluster settings for cluster: {cluster_name}")
+    log(f"Using nodepath: {nodepath}")
+    
+    # Change to the nodepath first
+    log(f"Changing to nodepath: {nodepath}")
+    send_ssh_command(shell, f"change-config-node {nodepath}", log=log)
+    
+    # Enter configuration mode
+    log("Entering configuration mode...")
+    output = send_ssh_command(shell, "configure terminal", log=log)
     
+    # Config levels actually entered; only these get an 'exit', so the session isn't left or dropped
+    cfg_depth = 0 if _CLI_ERROR_RE.search(output) else 1
+    
+    # Enter LC cluster profile
+    log(f"Entering LC cluster profile: {cluster_name}")
+    output = send_ssh_command(shell, f"lc-cluster group-profile {cluster_name}", log=log)
+    
+    # An unrecognised prompt without an error still means the profile was entered
+    if not _CLI_ERROR_RE.search(output):
+        cfg_depth += 1
+    
+    # Check if we're in the cluster profile context
+    if _CLUSTER_CTX_RE.search(output):
+        log("✓ Successfully entered LC cluster profile context.")
+    else:
+        log("Checking alternative methods to enter cluster context...")
+        # Try alternative approach - sometimes the profile might exist but output differently
+        log("Attempting to configure redundancy directly...")
+    
+    # Try to configure settings regardless - sometimes the context check fails but commands work.
+    # The settings, the exits and the save at this nodepath go out in one batch.
+    log("[STEP 4/5] Re-enabling redundancy and active AP load balancing...")
+    log(f"[STEP 5/5] Saving configuration for nodepath {nodepath}...")
+    try:
+        script = [
+            "redundancy",
+            "active-ap-lb",
+            *["exit"] * cfg_depth,  # Exit LC cluster configuration and configuration mode
+        ]
+        if save_lock is None:
+            script.append("write memory")  # CRITICAL: save at this nodepath before moving to next cluster
+            restore_output = send_ssh_script(shell, script, final_wait=8, log=log)
+        else:
+            restore_output = send_ssh_script(shell, script, final_wait=2, log=log)
+            with save_lock:
+                # CRITICAL: save at this nodepath before the session is closed
+                restore_output += send_ssh_command(shell, "write memory", wait_time=8, log=log)
+        
+        if not _CLI_ERROR_RE.search(restore_output):
+            log("✓ Redundancy re-enabled successfully.")
+            log("✓ Active AP load balancing re-enabled successfully.")
+            log(f"✓ Configuration saved for nodepath {nodepath}")
+            lc_restoration_success = True
+        else:
+            log(f"⚠️  Restore command output: {restore_output}")
+        
+    except Exception as config_error:
+        log(f"✗ Error configuring cluster settings: {str(config_error)}")
+    
+    log(f"{'✓' if lc_restoration_success else '⚠️'} LC cluster '{cluster_name}' processing completed.")
+    return lc_restoration_success
+
+def _restore_cluster_on_channel(transport, cluster_name, nodepath, save_lock):
+    """Restore one LC cluster on its own MM shell channel, returning (ok, output lines)
+
+    ok is None when the MM refused to open the extra channel, so the caller can retry on the main shell.
+    """
+    lines = []
+    log = lines.append
+    
+    channel = None
+    try:
+        try:
+            channel = transport.open_session()
+            channel.get_pty()
+            channel.invoke_shell()
+        except paramiko.SSHException as e:  # Includes ChannelException, e.g. "Administratively prohibited"
+            log(f"Mobility Conductor refused an extra session channel for cluster {cluster_name}: {str(e)}")
+            return None, lines
+        
+        read_ssh_output(channel)  # Wait for the initial prompt
+        # Each channel saves its own nodepath, one channel at a time
+        return _restore_cluster(channel, cluster_name, nodepath, log=log, save_lock=save_lock), lines
+    except Exception as e:
+        log(f"✗ Error on Mobility Conductor channel for cluster {cluster_name}: {str(e)}")
+        return False, lines
     finally:
-        # Close SSH connection
-        if ssh_client:
-            ssh_client.close()
-            print("SSH connection closed.")
+        if channel is not None:
+            channel.close()
 
 def cleanup_ap_convert(mc_username, mc_password, mm_ip, mm_username, mm_password):
     """Clean up AP convert configuration and re-enable LC cluster settings on all discovered controllers"""
@@ -1809,8 +2338,7 @@ def cleanup_ap_convert(mc_username, mc_password, mm_ip, mm_username, mm_password
     if selected_ap_groups:
         print(f"\nThis will also clear the selected AP groups list: {', '.join(selected_ap_groups)}")
     
-    confirm = input(f"\nProceed with cleanup and LC cluster restoration? (y/n): ")
-    if confirm.lower() != 'y':
+    if ask(f"\nProceed with cleanup and LC cluster restoration? (y/n): ") != 'y':
         print("Cleanup cancelled.")
         return False
     
@@ -1818,64 +2346,32 @@ def cleanup_ap_convert(mc_username, mc_password, mm_ip, mm_username, mm_password
     failed_controllers = []
     
     # PHASE 1: Clean up AP convert on all MCs
-    print(f"\n{'='*60}")
+    print(f"\n{_BANNER_EQ}")
     print("PHASE 1: AP Convert Cleanup on Mobility Controllers")
-    print(f"{'='*60}")
-    
-    for controller in controllers:
-        print(f"\n[MC] Processing: {controller['name']} ({controller['ip_address']})")
-        print('-'*50)
-        
-        # Connect to controller via SSH
-        ssh_client, shell = ssh_to_mm(controller['ip_address'], mc_username, mc_password)
-        
-        if not ssh_client or not shell:
-            print(f"Failed to establish SSH connection to {controller['name']}. Skipping.")
-            failed_controllers.append(controller['name'])
-            continue
-        
-        try:
-            # Step 1: Execute ap convert clear-all command
-            print(f"[STEP 1/2] Executing 'ap convert clear-all' on {controller['name']}...")
-            output = send_ssh_command(shell, "ap convert clear-all", wait_time=2)
-            
-            # Check for confirmation prompt
-            if "Do you want to proceed with the operation? [y/n]:" in output:
-                print("Received confirmation prompt for clear-all. Sending 'y'...")
-                output = send_ssh_command(shell, "y", wait_time=2)
-                print("Clear-all command executed.")
-            else:
-                print("Clear-all command completed (no confirmation required).")
-            
-            # Step 2: Execute ap convert cancel command
-            print(f"[STEP 2/2] Executing 'ap convert cancel' on {controller['name']}...")
-            output = send_ssh_command(shell, "ap convert cancel", wait_time=2)
-            
-            # Check for confirmation prompt
-            if "Do you want to proceed with the operation? [y/n]:" in output:
-                print("Received confirmation prompt for cancel. Sending 'y'...")
-                output = send_ssh_command(shell, "y", wait_time=2)
-                print("Cancel command executed.")
+    print(_BANNER_EQ)
+    
+    # Each controller is cleaned up in its own thread; its output is buffered and printed as a block,
+    # in controller order
+    with ThreadPoolExecutor(max_workers=min(16, len(controllers))) as executor:
+        results = executor.map(
+            lambda controller: _cleanup_one_mc(controller, mc_username, mc_password),
+            controllers
+        )
+        for name, ok, lines in results:
+            print("\n".join(lines))
+            if ok:
+                success_count += 1
             else:
-                print("Cancel command completed (no confirmation required).")
-                
-            print(f"✓ AP Convert cleanup completed successfully on {controller['name']}")
-            success_count += 1
-            
-        except Exception as e:
-            print(f"✗ Error during SSH session with {controller['name']}: {str(e)}")
-            failed_controllers.append(controller['name'])
-        
-        finally:
-            # Close SSH connection
-            if ssh_client:
-                ssh_client.close()
-                print(f"SSH connection to {controller['name']} closed.")
+                failed_controllers.append(name)
     
     # PHASE 2: Restore LC cluster settings on MM
-    print(f"\n{'='*60}")
+    print(f"\n{_BANNER_EQ}")
     print("PHASE 2: LC Cluster Restoration on Mobility Conductor")
-    print(f"{'='*60}")
+    print(_BANNER_EQ)
+    
+    # Outcome per cluster name, filled in as each restoration finishes
+    restore_results = {}
+    targeted_restore = prep_migration_target is not None
     
     # Determine which clusters to restore based on prep migration target
     if prep_migration_target:
@@ -1898,99 +2394,48 @@ def cleanup_ap_convert(mc_username, mc_password, mm_ip, mm_username, mm_password
         print("No valid LC cluster information found for restoration.")
         print("Skipping LC cluster restoration.")
     else:
-        print('-'*50)
+        print(_BANNER_DASH)
         
-        # Connect to MM via SSH
-        mm_ssh_client, mm_shell = ssh_to_mm(mm_ip, mm_username, mm_password)
+        # Connect to MM via SSH, reusing the prep migration session when it is still alive
+        mm_shell = get_shell(mm_ip, mm_username, mm_password)
         
-        if not mm_ssh_client or not mm_shell:
+        if not mm_shell:
             print("Failed to establish SSH connection to Mobility Conductor. Skipping LC cluster restoration.")
         else:
             try:
-                lc_restoration_success = False
-                
-                for cluster_name, nodepath in clusters_info:
-                    print(f"\n[STEP 3/5] Restoring LC cluster settings for cluster: {cluster_name}")
-                    print(f"Using nodepath: {nodepath}")
-                    
-                    # Change to the nodepath first
-                    print(f"Changing to nodepath: {nodepath}")
-                    send_ssh_command(mm_shell, f"change-config-node {nodepath}")
-                    
-                    # Enter configuration mode
-                    print("Entering configuration mode...")
-                    send_ssh_command(mm_shell, "configure terminal")
-                    
-                    # Enter LC cluster profile
-                    print(f"Entering LC cluster profile: {cluster_name}")
-                    output = send_ssh_command(mm_shell, f"lc-cluster group-profile {cluster_name}")
-                    
-                    # Check if we're in the cluster profile context
-                    in_cluster_context = False
-                    if any(x in output for x in [
-                        "Classic Controller Cluster Profile", 
-                        "(lc-cluster-profile)", 
-                        "(LC-CLUSTER-PROFILE)",
-                        "lc-cluster-profile"
-                    ]):
-                        in_cluster_context = True
-                        print("✓ Successfully entered LC cluster profile context.")
-                    else:
-                        print("Checking alternative methods to enter cluster context...")
-                        # Try alternative approach - sometimes the profile might exist but output differently
-                        print("Attempting to configure redundancy directly...")
+                serial_clusters = clusters_info
+                if len(clusters_info) >= 2 and not prep_migration_target:
+                    # Independent clusters: one MM session channel per cluster over the same SSH transport
+                    transport = pooled_client(mm_ip, mm_username).get_transport()
+                    save_lock = threading.Lock()
+                    serial_clusters = []
+                    with ThreadPoolExecutor(max_workers=min(8, len(clusters_info))) as executor:
+                        results = executor.map(
+                            lambda cluster: _restore_cluster_on_channel(transport, *cluster, save_lock),
+                            clusters_info
+                        )
+                        for (cluster_name, nodepath), (ok, lines) in zip(clusters_info, results):
+                            print("\n".join(lines))
+                            if ok is None:
+                                serial_clusters.append((cluster_name, nodepath))
+                            else:
+                                restore_results[cluster_name] = ok
                     
-                    # Try to configure settings regardless - sometimes the context check fails but commands work
-                    try:
-                        # Re-enable redundancy
-                        print("[STEP 4/5] Re-enabling redundancy...")
-                        redundancy_output = send_ssh_command(mm_shell, "redundancy")
-                        if "Error" not in redundancy_output and "Invalid" not in redundancy_output:
-                            print("✓ Redundancy re-enabled successfully.")
-                        else:
-                            print(f"⚠️  Redundancy command output: {redundancy_output}")
-                        
-                        # Re-enable active AP load balancing
-                        print("[STEP 4/5] Re-enabling active AP load balancing...")
-                        aplb_output = send_ssh_command(mm_shell, "active-ap-lb")
-                        if "Error" not in aplb_output and "Invalid" not in aplb_output:
-                            print("✓ Active AP load balancing re-enabled successfully.")
-                        else:
-                            print(f"⚠️  Active AP load balancing command output: {aplb_output}")
-                        
-                        lc_restoration_success = True
-                        
-                    except Exception as config_error:
-                        print(f"✗ Error configuring cluster settings: {str(config_error)}")
-                    
-                    # Exit LC cluster configuration
-                    print("Exiting LC cluster profile...")
-                    send_ssh_command(mm_shell, "exit")
-                    
-                    # Exit configuration mode  
-                    print("Exiting configuration mode...")
-                    send_ssh_command(mm_shell, "exit")
-                    
-                    # CRITICAL: Save configuration at this nodepath before moving to next cluster
-                    print(f"[STEP 5/5] Saving configuration for nodepath {nodepath}...")
-                    send_ssh_command(mm_shell, "write memory", wait_time=5)
-                    print(f"✓ Configuration saved for nodepath {nodepath}")
-                    
-                    print(f"{'✓' if lc_restoration_success else '⚠️'} LC cluster '{cluster_name}' processing completed.")
+                    if serial_clusters:
+                        print(f"\nRestoring {len(serial_clusters)} cluster(s) one at a time on the main session...")
+                
+                for cluster_name, nodepath in serial_clusters:
+                    restore_results[cluster_name] = _restore_cluster(mm_shell, cluster_name, nodepath)
                 
-                # Final save at root level for good measure
+                # Final save for good measure; every cluster has already saved at its own nodepath
                 print("\n[FINAL STEP] Performing final configuration save at root level...")
                 send_ssh_command(mm_shell, "write memory", wait_time=5)
                 print("✓ Final configuration save completed.")
                 
             except Exception as e:
                 print(f"✗ Error during SSH session with Mobility Conductor: {str(e)}")
-            
-            finally:
-                # Close MM SSH connection
-                if mm_ssh_client:
-                    mm_ssh_client.close()
-                    print("SSH connection to Mobility Conductor closed.")
+                # The session may be left inside config mode, so don't reuse it
+                close_shell(mm_ip, mm_username)
     
     # Clear selected AP groups list and prep migration target after cleanup
     if success_count > 0:
@@ -1999,20 +2444,19 @@ def cleanup_ap_convert(mc_username, mc_password, mm_ip, mm_username, mm_password
         print(f"\n🗑️  Selected AP groups list has been cleared.")
         print(f"🗑️  Prep migration target has been cleared.")
     
-    print(f"\n{'='*60}")
+    print(f"\n{_BANNER_EQ}")
     print("=== AP Convert Cleanup & LC Cluster Restoration Summary ===")
-    print(f"{'='*60}")
+    print(_BANNER_EQ)
     print(f"Total controllers processed: {len(controllers)}")
     print(f"Successful AP convert cleanups: {success_count}")
     print(f"Failed AP convert cleanups: {len(failed_controllers)}")
     
+    restored_count = sum(1 for ok in restore_results.values() if ok)
     if clusters_info:
-        if prep_migration_target:
-            print(f"LC cluster restored: {prep_migration_target['cluster_name']} (targeted restoration)")
-        else:
-            print(f"LC clusters processed: {len(clusters_info)} (full restoration)")
-            for cluster_name, nodepath in clusters_info:
-                print(f"  - {cluster_name}")
+        print(f"LC clusters restored: {restored_count} of {len(clusters_info)} "
+              f"({'targeted' if targeted_restore else 'full'} restoration)")
+        for cluster_name, nodepath in clusters_info:
+            print(f"  {'✓' if restore_results.get(cluster_name) else '✗'} {cluster_name}")
     
     if failed_controllers:
         print(f"\nControllers that failed AP convert cleanup:")
@@ -2023,10 +2467,12 @@ def cleanup_ap_convert(mc_username, mc_password, mm_ip, mm_username, mm_password
     if success_count > 0:
         print(f"\n✓ AP Convert cleanup completed successfully on {success_count} controllers.")
         if clusters_info:
-            if prep_migration_target:
+            if restored_count < len(clusters_info):
+                print(f"✗ LC cluster restoration failed for {len(clusters_info) - restored_count} cluster(s).")
+            elif targeted_restore:
                 print("✓ LC cluster restoration completed for the SPECIFIC cluster prepared in Option 2.")
             else:
-                print("✓ LC cluster restoration attempted on Mobility Conductor.")
+                print("✓ LC cluster restoration completed on Mobility Conductor.")
             print("\n⚠️  IMPORTANT: Please verify LC cluster settings manually:")
             print("   1. SSH to each controller and run: show lc-cluster group-membership")
             print("   2. Verify 'Redundancy Mode' shows 'On'")
@@ -2055,9 +2501,9 @@ def run_all_steps(session, ip, token, uid, mc_username, mc_password):
     
     display_md_switches(md_switches)
     
-    # Store controllers in database
-    for controller in md_switches:
-        store_controller(controller)
+    # Store controllers in database, committing once for the whole batch
+    with migration_transaction() as conn:
+        controller_ids = store_controllers_bulk(md_switches, conn)
     
     # Set global variable
     global stored_md_switches
@@ -2065,32 +2511,41 @@ def run_all_steps(session, ip, token, uid, mc_username, mc_password):
     
     # Step 2: Get LC cluster information for all MDs
     print("\n[STEP 2/5] Collecting LC Cluster Information...")
-    for controller in stored_md_switches:
-        controller_ip = controller[0]
-        controller_name = controller[1]
-        print(f"\nFetching LC cluster info from {controller_name} ({controller_ip})...")
-        
-        cluster_data = fetch_lc_cluster_info(controller_ip, mc_username, mc_password)
-        if cluster_data:
-            print(f"Successfully retrieved LC cluster info from {controller_name}")
-            cluster_info = parse_lc_cluster_info(cluster_data)
-            controller_id = store_controller(controller)
-            store_lc_cluster(controller_id, cluster_info)
-            print(f"Stored LC cluster info for {controller_name}")
+    # Fetch from every controller in parallel; results are stored from this thread only
+    with ThreadPoolExecutor(max_workers=min(12, len(stored_md_switches))) as executor:
+        futures = {}
+        for controller in stored_md_switches:
+            print(f"\nFetching LC cluster info from {controller[1]} ({controller[0]})...")
+            futures[executor.submit(fetch_lc_cluster_info, controller[0], mc_username, mc_password)] = controller
+        
+        with migration_transaction() as conn:
+            # Stored in submission order so row ids and output follow the controller list
+            for future, controller in futures.items():
+                controller_name = controller[1]
+                cluster_data = future.result()
+                if cluster_data:
+                    print(f"Successfully retrieved LC cluster info from {controller_name}")
+                    cluster_info = parse_lc_cluster_info(cluster_data)
+                    store_lc_cluster(controller_ids[controller[0]], cluster_info, conn)
+                    print(f"Stored LC cluster info for {controller_name}")
     
     # Step 3: Get AP groups from all MDs
     print("\n[STEP 3/5] Collecting AP Groups...")
-    for controller in stored_md_switches:
-        controller_ip = controller[0]
-        controller_name = controller[1]
-        print(f"\nFetching AP groups from {controller_name} ({controller_ip})...")
-        
-        ap_groups_data = fetch_ap_groups(controller_ip, mc_username, mc_password)
-        if ap_groups_data:
-            print(f"Successfully retrieved AP groups from {controller_name}")
-            controller_id = store_controller(controller)
-            store_ap_groups(controller_id, ap_groups_data)
-            print(f"Stored AP groups for {controller_name}")
+    with ThreadPoolExecutor(max_workers=min(12, len(stored_md_switches))) as executor:
+        futures = {}
+        for controller in stored_md_switches:
+            print(f"\nFetching AP groups from {controller[1]} ({controller[0]})...")
+            futures[executor.submit(fetch_ap_groups, controller[0], mc_username, mc_password)] = controller
+        
+        with migration_transaction() as conn:
+            # Stored in submission order so row ids and output follow the controller list
+            for future, controller in futures.items():
+                controller_name = controller[1]
+                ap_groups_data = future.result()
+                if ap_groups_data:
+                    print(f"Successfully retrieved AP groups from {controller_name}")
+                    store_ap_groups(controller_ids[controller[0]], ap_groups_data, conn)
+                    print(f"Stored AP groups for {controller_name}")
     
     # Step 4: Get AP database information
     print("\n[STEP 4/5] Collecting AP Database Information...")
@@ -2193,8 +2648,7 @@ def main():
                 
             print("\nPreparing for migration by disabling LC-cluster settings...")
             print("This will use SSH to connect to the Mobility Conductor.")
-            confirm = input("Continue? (y/n): ")
-            if confirm.lower() == 'y':
+            if ask("Continue? (y/n): ") == 'y':
                 mm_password = getpass("Re-enter MM Password: ")
                 prep_migration_ssh(mm_ip, mm_username, mm_password)
         
@@ -2211,8 +2665,7 @@ def main():
                 
             print(f"\nInitializing AP Convert on cluster: {selected_cluster}")
             print("This will execute the AP convert command on all controllers in the selected cluster.")
-            confirm = input("Continue? (y/n): ")
-            if confirm.lower() == 'y':
+            if ask("Continue? (y/n): ") == 'y':
                 execute_ap_convert_init(mc_username, mc_password)
         
         elif choice == "6":
@@ -2223,9 +2676,9 @@ def main():
             select_and_add_ap_group()
         
         elif choice == "7":
-            print("\n" + "="*60)
+            print("\n" + _BANNER_EQ)
             print("AP Convert Cleanup & LC Cluster Restoration")
-            print("="*60)
+            print(_BANNER_EQ)
             print("This will execute the following commands:")
             print("ON MOBILITY CONTROLLERS:")
             print("• ap convert clear-all    - Removes all AP groups from conversion")
@@ -2246,6 +2699,7 @@ def main():
 
         elif choice == "9":  # Update this from "8"
             print("Exiting...")
+            close_all_shells()
             break
         
         else: